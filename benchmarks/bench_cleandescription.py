@@ -0,0 +1,76 @@
+"""
+Очистка HTML-описаний: потоковый html.parser против BeautifulSoup (и lxml, если установлен).
+
+Замеряет время на описание для полного разбора и для превью. Эквивалентность
+бэкендов на тех же образцах проверяет tests/test_cleandescription.py.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_cleandescription
+"""
+import timeit
+from constants import DESCRIPTION_PREVIEW
+from src.utils.cleandescription import cleandescription
+
+REMOTEOK_STYLE = (
+    "<p><strong>About Acme</strong></p><p>Acme is a remote-first company building tools for "
+    "distributed teams &amp; their managers. We&#39;re backed by top investors.</p>"
+    "<h2>What you&rsquo;ll do</h2><ul>"
+    + "".join(f"<li>Build and ship features in React &amp; TypeScript, item {i}</li>" for i in range(40))
+    + "</ul><h2>Requirements</h2><ul>"
+    + "".join(f"<li>{i}+ years with <em>modern</em> frontend tooling (Vite, Webpack)</li>" for i in range(30))
+    + "</ul><p>Salary: $90k&nbsp;&ndash;&nbsp;$140k</p>"
+    "<script>window.track('job_view')</script><style>.apply{color:red}</style>"
+    "<p>Please mention the word <b>BRILLIANT</b> when applying.</p>"
+)
+
+NOMADS_STYLE = (
+    "<div class=\"job\"><div><br></div><p>We are looking for a <b>Senior Frontend Engineer</b> "
+    "to join our product team.</p><!-- internal note -->"
+    + "".join(
+        f"<p>Paragraph {i}: you will collaborate with designers, write tests, "
+        f"review pull requests and mentor <a href=\"https://example.com/{i}\">engineers</a>.</p>"
+        for i in range(60)
+    )
+    + "<table><tr><td>Location</td><td>Worldwide</td></tr></table></div>"
+)
+
+HH_STYLE = "Разработка и поддержка <highlighttext>frontend</highlighttext> части продукта. Работа с React, Redux."
+
+PLAIN = "Remote frontend role, no markup at all, just text " * 20
+
+BROKEN = "<div><p>Unclosed <b>tags & stray < brackets <i>everywhere<p>next para</div></span> tail"
+
+SAMPLES = {
+    "remoteok": REMOTEOK_STYLE,
+    "nomads": NOMADS_STYLE,
+    "hh": HH_STYLE,
+    "plain": PLAIN,
+    "broken": BROKEN,
+}
+
+
+def backends():
+    names = ["stream", "bs4"]
+    try:
+        import lxml  # noqa: F401
+        names.append("lxml")
+    except ImportError:
+        pass
+    return names
+
+
+def main():
+    rounds = 200
+    print(f"{'описание':<10}{'размер':>8}" + "".join(f"{name + ', мкс':>14}" for name in backends()) + f"{'превью, мкс':>14}")
+    for name, html in SAMPLES.items():
+        row = f"{name:<10}{len(html):>8}"
+        for backend in backends():
+            seconds = timeit.timeit(lambda: cleandescription(html, backend=backend), number=rounds)
+            row += f"{seconds / rounds * 1e6:>14.1f}"
+        seconds = timeit.timeit(lambda: cleandescription(html, max_chars=DESCRIPTION_PREVIEW), number=rounds)
+        row += f"{seconds / rounds * 1e6:>14.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
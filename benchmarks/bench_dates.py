@@ -0,0 +1,56 @@
+"""
+Сравнение разбора дат: dateparser на каждый элемент против parse_date
+(быстрый ISO-8601/RFC 2822 + LRU-кэш + dateparser как запасной вариант).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_dates
+"""
+import timeit
+from dateparser import parse
+from src.utils.dateutils import parse_date, parse_fixed_date, parse_freeform_date
+
+# Образцы дат в том виде, в каком их отдаёт каждый источник
+SAMPLES = {
+    "hh": ["2025-07-01T13:12:56+0300", "2025-06-30T09:01:12+0300", "2025-06-29T18:45:00+0300"],
+    "hiringcafe": ["2025-07-01T12:25:54.774Z", "2025-06-30T07:00:00.000Z", "2025-06-29T21:13:02.120Z"],
+    "json": ["2025-06-27T12:36:22+00:00", "2025-06-26T08:10:00+00:00", "2025-06-25T16:42:31+00:00"],
+    "nomads": ["2025-07-01T04:51:03-04:00", "2025-06-30T11:20:45-04:00", "2025-06-29T02:05:10-04:00"],
+    "rss": ["Tue, 01 Jul 2025 04:51:03 +0000", "Mon, 30 Jun 2025 11:20:45 GMT", "Sun, 29 Jun 2025 02:05:10 +0000"],
+    "rapid": ["2 days ago", "today", "5 hours ago"],
+}
+ROUNDS = 200
+
+
+def bench_dateparser(values):
+    for value in values:
+        parse(value, settings={'TIMEZONE': 'UTC', 'TO_TIMEZONE': 'UTC'})
+
+
+def bench_parse_date(values):
+    for value in values:
+        parse_date(value)
+
+
+def clear_cache():
+    parse_fixed_date.cache_clear()
+    parse_freeform_date.cache_clear()
+
+
+def bench_parse_date_cold(values):
+    clear_cache()
+    bench_parse_date(values)
+
+
+def main():
+    print(f"{'источник':<12}{'dateparser, мкс':>18}{'без кэша, мкс':>16}{'с кэшем, мкс':>15}{'ускорение':>12}")
+    for source, values in SAMPLES.items():
+        count = ROUNDS * len(values)
+        slow = timeit.timeit(lambda: bench_dateparser(values), number=ROUNDS) / count * 1e6
+        cold = timeit.timeit(lambda: bench_parse_date_cold(values), number=ROUNDS) / count * 1e6
+        clear_cache()
+        warm = timeit.timeit(lambda: bench_parse_date(values), number=ROUNDS) / count * 1e6
+        print(f"{source:<12}{slow:>18.1f}{cold:>16.1f}{warm:>15.2f}{slow / warm:>11.0f}x")
+
+
+if __name__ == "__main__":
+    main()
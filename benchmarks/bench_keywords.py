@@ -0,0 +1,82 @@
+"""
+Стоимость фильтра по ключевым словам на одну вакансию в зависимости от числа терминов:
+прежний `any(keyword in content ...)` против KeywordMatcher (одно регулярное
+выражение на префиксном дереве с границами слов).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_keywords
+"""
+import random
+import timeit
+from src.utils.keywordmatcher import KeywordMatcher
+
+VOCABULARY = [
+    "frontend", "front-end", "react", "vue", "angular", "svelte", "typescript", "javascript", "node.js",
+    "next.js", "nuxt", "redux", "webpack", "vite", "css", "sass", "tailwind", "html", "graphql", "jest",
+    "cypress", "storybook", "figma", "web", "developer", "engineer", "senior", "junior",
+]
+# Короткие термины вроде "ui" подстрокой находятся почти везде ("build"):
+# прежний фильтр пропускал бы такие вакансии ложно, здесь они показаны отдельно
+SHORT_TERMS = ["ui", "ux"]
+DESCRIPTION = (
+    "We are hiring to build our customer dashboard. You will work closely with product, "
+    "own features end to end and care about accessibility and performance. "
+    "Our team ships several times a day and values written communication. "
+) * 4
+TITLES = ["Account Manager", "Data Analyst", "Backend Lead", "Sales Representative", "Frontend Developer"]
+
+
+def make_keywords(count: int, rng: random.Random):
+    keywords = list(VOCABULARY)
+    while len(keywords) < count:
+        keywords.append("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10))))
+    return keywords[:count]
+
+
+def make_items(count: int, rng: random.Random):
+    items = []
+    for _ in range(count):
+        # Большинство вакансий в общих лентах фильтр не проходят
+        title = rng.choice(TITLES)
+        tags = rng.sample(["sales", "finance", "marketing", "support", "python", "go", "react"], 2)
+        items.append((title, DESCRIPTION, tags))
+    return items
+
+
+def naive(keywords, items):
+    result = 0
+    for title, description, tags in items:
+        content = f"{title.lower()} {description.lower()} {' '.join(tags)}".strip()
+        if any(keyword in content for keyword in keywords):
+            result += 1
+    return result
+
+
+def compiled(matcher, items):
+    result = 0
+    for title, description, tags in items:
+        if matcher.matches(title=title, description=description, tags=tags):
+            result += 1
+    return result
+
+
+def main():
+    rng = random.Random(42)
+    items = make_items(500, rng)
+
+    keywords = VOCABULARY + SHORT_TERMS
+    print(f"Прошло фильтр из {len(items)} с терминами {SHORT_TERMS}: "
+          f"any() — {naive(keywords, items)}, matcher — {compiled(KeywordMatcher(keywords), items)}\n")
+
+    print(f"{'терминов':>9}{'any(), мкс':>14}{'matcher, мкс':>15}{'сборка, мс':>13}")
+    for count in (5, 20, 50, 100, 300, 500, 1000, 2000):
+        keywords = make_keywords(count, rng)
+        build = timeit.timeit(lambda: KeywordMatcher(keywords), number=5) / 5
+        matcher = KeywordMatcher(keywords)
+        slow = timeit.timeit(lambda: naive(keywords, items), number=5) / (5 * len(items))
+        fast = timeit.timeit(lambda: compiled(matcher, items), number=5) / (5 * len(items))
+        print(f"{count:>9}{slow * 1e6:>14.1f}{fast * 1e6:>15.1f}{build * 1e3:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
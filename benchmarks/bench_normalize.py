@@ -0,0 +1,102 @@
+"""
+Пропускная способность нормализации ленты (дата, очистка HTML, теги) на 10 000
+синтетических вакансий: в цикле событий (NORMALIZE_WORKERS=0) против пула
+потоков и пула процессов с разным числом исполнителей.
+Дополнительно показано, насколько цикл событий остаётся свободным для I/O:
+максимальная задержка фоновой задачи, которая просыпается каждые 5 мс.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_normalize
+"""
+import asyncio
+import os
+import random
+import time
+from src.utils.normalizepool import RawFields, normalize_stream, shutdown_executors
+
+ITEMS = 10_000
+TAGS = ["React", "Vue & Nuxt", "TypeScript", "Node.js / Express", "CSS and Sass", "Remote", "GraphQL"]
+DATES = ["2025-03-{:02d}T{:02d}:15:00Z", "Mon, {:02d} Mar 2025 {:02d}:15:00 +0000"]
+
+
+def make_description(rng: random.Random) -> str:
+    paragraphs = "".join(
+        f"<p>Paragraph {i}: build <b>React</b> &amp; TypeScript features, review pull requests and "
+        f"mentor <a href=\"https://example.com/{i}\">engineers</a>.</p>"
+        for i in range(rng.randint(10, 30))
+    )
+    return f"<div><h2>About the role</h2>{paragraphs}<ul><li>Remote</li><li>Equity</li></ul></div>"
+
+
+def make_feed(rng: random.Random):
+    feed = []
+    for index in range(ITEMS):
+        date = rng.choice(DATES).format(rng.randint(1, 28), rng.randint(0, 23))
+        feed.append({
+            "id": index,
+            "date": date,
+            "description": make_description(rng),
+            "tags": rng.sample(TAGS, 3),
+        })
+    return feed
+
+
+def raw_fields(item) -> RawFields:
+    return RawFields(date=item["date"], description=item["description"], tags=tuple(item["tags"]))
+
+
+async def items_from(feed):
+    # Как при потоковом чтении из сети: между порциями цикл событий свободен
+    for index, item in enumerate(feed):
+        if index % 50 == 0:
+            await asyncio.sleep(0)
+        yield item
+
+
+async def measure(feed, workers: int, kind: str):
+    lag = 0.0
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal lag
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lag = max(lag, time.perf_counter() - started - 0.005)
+
+    ticker = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    count = 0
+    async for _ in normalize_stream(items_from(feed), raw_fields, None, workers=workers, kind=kind):
+        count += 1
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    assert count == len(feed)
+    return count / elapsed, lag
+
+
+async def run(feed):
+    cpus = os.cpu_count() or 1
+    print(f"{'режим':<18}{'вакансий/с':>12}{'макс. задержка цикла, мс':>27}")
+    configs = [(0, "inline")] + [
+        (workers, kind) for kind in ("thread", "process") for workers in sorted({2, 4, cpus})
+    ]
+    for workers, kind in configs:
+        # Первый прогон прогревает пул (запуск процессов, импорты в них)
+        if workers:
+            await measure(feed[:500], workers, kind)
+        rate, lag = await measure(feed, workers, kind)
+        label = "цикл событий" if not workers else f"{kind} × {workers}"
+        print(f"{label:<18}{rate:>12.0f}{lag * 1e3:>27.1f}")
+    shutdown_executors()
+
+
+def main():
+    feed = make_feed(random.Random(42))
+    asyncio.run(run(feed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+"""
+Офлайн-замер парсеров: записанные ответы API (HH, Hiring Cafe, Rapid, Working Nomads,
+JSON-лента, RSS) отдаются локальным HTTP-сервером вместо настоящих источников.
+
+Каждый парсер запускается в отдельном процессе во временном каталоге (своё
+хранилище состояния, отдельный пиковый RSS). Для каждого показываются:
+вакансий в секунду, p50/p99 задержки между вакансиями, пик памяти Python-объектов
+(tracemalloc, отдельный прогон) и пиковый RSS процесса.
+
+Ответы хранятся в benchmarks/fixtures/<источник>.json. Если файла нет, он
+создаётся из синтетических данных в формате API; --record записывает настоящие
+ответы через тот же локальный сервер, проксируя запросы к адресам из sources.json.
+
+Сравнение с базовой линией: --save-baseline записывает результаты, --check
+завершается с кодом 1, если вакансий/с стало меньше, а p99 или память — больше,
+чем допускает --threshold (по умолчанию 15%).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_parsers [--runs 3] [--only hh rss]
+    python -m benchmarks.bench_parsers --save-baseline
+    python -m benchmarks.bench_parsers --check --threshold 0.15
+    python -m benchmarks.bench_parsers --record --only hh
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+BASELINE_FILE = os.path.join(ROOT, "benchmarks", "baseline_parsers.json")
+KEYWORDS = "frontend,react,javascript,typescript,vue"
+
+# Источник → тип парсера и опции; адрес подставляется локальный
+SOURCES = {
+    "hh": {"type": "hh"},
+    "hiringcafe": {"type": "hiringcafe", "keywords": "frontend"},
+    "rapid": {"type": "rapid", "options": {"host": "bench", "key": "bench"}},
+    "nomads": {"type": "nomads", "keywords": KEYWORDS},
+    "json": {"type": "json", "keywords": KEYWORDS},
+    "rss": {"type": "rss", "keywords": KEYWORDS},
+}
+# Показатели для проверки регрессии: имя → (больше значит лучше, изменение меньше этого — шум)
+METRICS = {
+    "items_per_sec": (True, 0.0),
+    "p99_ms": (False, 0.5),
+    "alloc_peak_kb": (False, 64.0),
+    "rss_mb": (False, 2.0),
+}
+
+TITLES = [
+    "Senior Frontend Developer", "React Engineer", "Vue.js Developer", "JavaScript Engineer",
+    "TypeScript Frontend Lead", "Backend Engineer", "Data Analyst", "Account Manager",
+]
+COMPANIES = ["ACME", "Globex", "Initech", "Umbrella & Co", "Hooli", "Вектор"]
+LOCATIONS = ["Germany", "Remote", "Poland", "Москва", "Spain", "Worldwide"]
+SKILLS = ["React", "Vue", "TypeScript", "JavaScript", "CSS", "Node.js", "GraphQL", "Next.js"]
+
+
+def html_description(rng: random.Random, paragraphs: int) -> str:
+    body = "".join(
+        f"<p>Paragraph {i}: build <b>{rng.choice(SKILLS)}</b> features &amp; review pull requests, "
+        f"mentor <a href=\"https://example.com/{i}\">engineers</a>.</p>"
+        for i in range(paragraphs)
+    )
+    return f"<div><h2>About the role</h2>{body}<ul><li>Remote</li><li>Equity</li></ul></div>"
+
+
+def published(rng: random.Random, now: datetime) -> datetime:
+    return now - timedelta(minutes=rng.randint(1, 24 * 60))
+
+
+def synthetic_pages(name: str, rng: random.Random) -> List[str]:
+    """Ответы в формате API источника: по одному на страницу (для RSS — на ленту)."""
+    now = datetime.now(timezone.utc)
+    if name == "hh":
+        pages = 5
+        return [json.dumps({"found": pages * 100, "pages": pages, "items": [{
+            "id": f"{page}{index}",
+            "name": rng.choice(TITLES),
+            "alternate_url": f"https://hh.ru/vacancy/{page}{index}",
+            "published_at": published(rng, now).strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "snippet": {"responsibility": f"Разработка <highlighttext>frontend</highlighttext> части, {rng.choice(SKILLS)}."},
+            "employer": {"name": rng.choice(COMPANIES)},
+            "salary": {"from": rng.choice([None, 150000]), "to": rng.choice([None, 250000]), "currency": "RUR"},
+            "experience": {"name": rng.choice(["От 1 года до 3 лет", "От 3 до 6 лет"])},
+            "area": {"name": rng.choice(LOCATIONS)},
+        } for index in range(100)]}, ensure_ascii=False) for page in range(pages)]
+
+    if name == "hiringcafe":
+        # Выдача отсортирована по дате; последняя страница неполная — на ней парсер останавливается
+        dates = sorted((published(rng, now) for _ in range(340)), reverse=True)
+        results = [{
+            "id": f"hc{index}",
+            "apply_url": f"https://hiring.cafe/job/{index}",
+            "v5_processed_job_data": {
+                "core_job_title": rng.choice(TITLES),
+                "workplace_type": "Remote",
+                "estimated_publish_date": date.isoformat(),
+                "requirements_summary": html_description(rng, 2),
+                "seniority_level": rng.choice(["Mid Level", "Senior Level"]),
+                "language_requirements": ["English"],
+                "workplace_countries": [rng.choice(LOCATIONS)],
+                "listed_compensation_frequency": "Yearly",
+                "yearly_min_compensation": 90000,
+                "yearly_max_compensation": 140000,
+                "listed_compensation_currency": "USD",
+                "company_name": rng.choice(COMPANIES),
+            },
+        } for index, date in enumerate(dates)]
+        return [json.dumps({"results": results[start:start + 100]}) for start in range(0, len(results), 100)]
+
+    if name == "rapid":
+        return [json.dumps({"jobs": [{
+            "id": f"r{index}",
+            "title": rng.choice(TITLES),
+            "jobProviders": [{"url": f"https://jobs.example.com/{index}"}],
+            "datePosted": f"{rng.randint(1, 23)} hours ago",
+            "description": html_description(rng, 3),
+            "location": rng.choice(LOCATIONS + ["Not specified"]),
+            "company": rng.choice(COMPANIES),
+            "salaryRange": rng.choice(["", "$90K - $140K"]),
+        } for index in range(300)]})]
+
+    if name == "nomads":
+        return [json.dumps([{
+            "id": index,
+            "title": rng.choice(TITLES),
+            "url": f"https://www.workingnomads.com/jobs/{index}",
+            "pub_date": published(rng, now).isoformat(),
+            "tags": ",".join(rng.sample(SKILLS, 3)).lower(),
+            "location": rng.choice(LOCATIONS),
+            "company_name": rng.choice(COMPANIES),
+            "description": html_description(rng, 15),
+        } for index in range(1000)])]
+
+    if name == "json":
+        # Как у RemoteOK: первый элемент — служебная запись без даты
+        items = [{"legal": "API terms of service"}] + [{
+            "id": str(index),
+            "date": published(rng, now).isoformat(),
+            "position": rng.choice(TITLES),
+            "tags": rng.sample(SKILLS, 3),
+            "description": html_description(rng, 15),
+            "apply_url": f"https://remoteok.com/remote-jobs/{index}",
+            "location": rng.choice(LOCATIONS),
+            "company": rng.choice(COMPANIES),
+            "salary_min": rng.choice([0, 80000]),
+            "salary_max": rng.choice([0, 150000]),
+        } for index in range(1000)]
+        return [json.dumps(items)]
+
+    if name == "rss":
+        feeds = []
+        for feed in range(3):
+            entries = "".join(
+                "<item>"
+                f"<title>{escape(rng.choice(TITLES))}</title>"
+                f"<link>https://feed{feed}.example.com/jobs/{index}</link>"
+                f"<guid>feed{feed}-{index}</guid>"
+                f"<pubDate>{format_datetime(published(rng, now))}</pubDate>"
+                f"<region>{escape(rng.choice(LOCATIONS))}</region>"
+                f"<description>{escape(html_description(rng, 8))}</description>"
+                "</item>"
+                for index in range(100)
+            )
+            feeds.append(
+                "<?xml version=\"1.0\" encoding=\"UTF-8\"?><rss version=\"2.0\"><channel>"
+                f"<title>Feed {feed}</title><link>https://feed{feed}.example.com/</link>{entries}</channel></rss>"
+            )
+        return feeds
+
+    raise ValueError(f"Нет синтетических данных для {name}")
+
+
+def fixture_path(name: str) -> str:
+    return os.path.join(FIXTURES_DIR, f"{name}.json")
+
+
+def load_fixture(name: str) -> Dict:
+    """Записанные ответы источника; при отсутствии создаёт синтетические."""
+    path = fixture_path(name)
+    if not os.path.exists(path):
+        os.makedirs(FIXTURES_DIR, exist_ok=True)
+        fixture = {
+            "recorded": False,
+            "content_type": "application/rss+xml" if name == "rss" else "application/json",
+            "pages": synthetic_pages(name, random.Random(42)),
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(fixture, file, ensure_ascii=False)
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+async def page_number(request) -> int:
+    """Номер страницы из параметра page запроса (HH) или JSON-тела (Hiring Cafe)."""
+    if request.method == "POST":
+        body = await request.json()
+        return int(body.get("page", 0))
+    return int(request.query.get("page", 0))
+
+
+async def start_server(name: str, fixture: Dict, upstream: Optional[List[str]] = None):
+    """
+    Локальный сервер вместо API источника. Отдаёт страницы из fixture;
+    с upstream запрашивает их у настоящего источника и сохраняет в fixture["pages"].
+    :return: (AppRunner, базовый адрес).
+    """
+    import aiohttp
+    from aiohttp import web
+
+    async def handle(request: "web.Request") -> "web.Response":
+        # RSS: /feed/<номер ленты>; остальные: номер страницы из запроса
+        index = int(request.match_info.get("index", 0)) if name == "rss" else await page_number(request)
+        if upstream is not None:
+            url = upstream[index] if name == "rss" else upstream[0]
+            forward = {key: value for key, value in request.headers.items()
+                       if key.lower() in ("accept", "user-agent", "x-rapidapi-key", "x-rapidapi-host")}
+            async with aiohttp.ClientSession() as session:
+                async with session.request(
+                    request.method, url, params=request.query, headers=forward,
+                    data=await request.read() if request.can_read_body else None,
+                    ssl=False
+                ) as response:
+                    body = await response.text()
+                    fixture["content_type"] = response.content_type
+            fixture["pages"].extend([""] * (index + 1 - len(fixture["pages"])))
+            fixture["pages"][index] = body
+            return web.Response(text=body, content_type=fixture["content_type"])
+        pages = fixture["pages"]
+        if index >= len(pages):
+            # Страница за пределами записи: пустая выдача в формате источника
+            return web.json_response({"results": [], "items": []})
+        return web.Response(text=pages[index], content_type=fixture["content_type"])
+
+    app = web.Application()
+    app.router.add_route("*", "/feed/{index}", handle)
+    app.router.add_route("*", "/", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def make_source(name: str, base_url: str, feeds: int):
+    from src.utils.sources import SourceConfig
+    spec = SOURCES[name]
+    url = [f"{base_url}/feed/{index}" for index in range(feeds)] if name == "rss" else f"{base_url}/"
+    return SourceConfig(
+        name=name, type=spec["type"], url=url,
+        keywords=spec.get("keywords", ""), options=spec.get("options", {})
+    )
+
+
+async def run_parser(name: str, base_url: str, feeds: int) -> List[float]:
+    """Один проход парсера с нуля. :return: моменты получения вакансий от старта, сек."""
+    from src.parsers.registry import create_parser
+    from src.utils.httpclient import create_session
+
+    async with create_session() as session:
+        parser = create_parser(make_source(name, base_url, feeds), None, session)
+        started = time.perf_counter()
+        stamps = []
+        async for _ in parser.stream():
+            stamps.append(time.perf_counter() - started)
+    return stamps
+
+
+async def measure(name: str, runs: int) -> Dict:
+    """Замер в дочернем процессе: лучший из runs проходов, затем проход под tracemalloc."""
+    fixture = load_fixture(name)
+    runner, base_url = await start_server(name, fixture)
+    feeds = len(fixture["pages"])
+    try:
+        # Прогрев: ленивые импорты (feedparser, dateparser) и кэши не входят в замер
+        await run_parser(name, base_url, feeds)
+        best = None
+        for _ in range(runs):
+            stamps = await run_parser(name, base_url, feeds)
+            if stamps and (best is None or stamps[-1] < best[-1]):
+                best = stamps
+        tracemalloc.start()
+        await run_parser(name, base_url, feeds)
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        await runner.cleanup()
+
+    best = best or [0.0]
+    gaps = [best[0]] + [later - earlier for earlier, later in zip(best, best[1:])]
+    percentiles = statistics.quantiles(gaps, n=100, method="inclusive") if len(gaps) > 1 else gaps * 99
+    return {
+        "items": len(best),
+        "items_per_sec": len(best) / best[-1] if best[-1] else 0.0,
+        "p50_ms": percentiles[49] * 1e3,
+        "p99_ms": percentiles[98] * 1e3,
+        "alloc_peak_kb": alloc_peak / 1024,
+        # ru_maxrss в Linux — КБ
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "recorded": fixture.get("recorded", False),
+    }
+
+
+async def record(name: str) -> None:
+    """Записывает настоящие ответы источника из sources.json через локальный сервер."""
+    from src.parsers.registry import create_parser
+    from src.utils.httpclient import create_session
+    from src.utils.sources import load_sources
+
+    source = next(s for s in load_sources(os.path.join(ROOT, "sources.json")) if s.name == name)
+    upstream = source.url if isinstance(source.url, list) else [url.strip() for url in source.url.split(",") if url.strip()]
+    fixture = {"recorded": True, "content_type": "application/json", "pages": []}
+    runner, base_url = await start_server(name, fixture, upstream)
+    try:
+        async with create_session() as session:
+            local = make_source(name, base_url, len(upstream))
+            local.keywords = source.keywords or local.keywords
+            local.options = source.options or local.options
+            parser = create_parser(local, None, session)
+            count = len([vacancy async for vacancy in parser.stream()])
+    finally:
+        await runner.cleanup()
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    with open(fixture_path(name), "w", encoding="utf-8") as file:
+        json.dump(fixture, file, ensure_ascii=False)
+    print(f"{name}: записано страниц {len(fixture['pages'])}, вакансий {count}")
+
+
+def run_child(name: str, runs: int) -> Dict:
+    """Запускает замер парсера в отдельном процессе во временном каталоге."""
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, PYTHONPATH=ROOT, LOG_LEVEL="WARNING")
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_parsers", "--child", name, "--runs", str(runs)],
+            cwd=workdir, env=env, capture_output=True, text=True
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"Замер {name} завершился с ошибкой:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def check(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """:return: Описания регрессий относительно базовой линии."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric, (higher_is_better, noise) in METRICS.items():
+            old, new = base[metric], result[metric]
+            if not old or abs(new - old) <= noise:
+                continue
+            change = (new - old) / old
+            if (higher_is_better and change < -threshold) or (not higher_is_better and change > threshold):
+                regressions.append(f"{name}: {metric} {old:.2f} → {new:.2f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=list(SOURCES), default=list(SOURCES))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Дочерний процесс: построчные логи парсеров искажали бы замер
+        logging.disable(logging.INFO)
+        print(json.dumps(asyncio.run(measure(args.child, args.runs))))
+        return
+    if args.record:
+        for name in args.only:
+            asyncio.run(record(name))
+        return
+
+    results = {}
+    print(f"{'парсер':<12}{'вакансий':>9}{'вак./с':>10}{'p50, мс':>10}{'p99, мс':>10}"
+          f"{'память, КБ':>12}{'RSS, МБ':>9}  данные")
+    for name in args.only:
+        result = run_child(name, args.runs)
+        results[name] = result
+        print(f"{name:<12}{result['items']:>9}{result['items_per_sec']:>10.0f}{result['p50_ms']:>10.3f}"
+              f"{result['p99_ms']:>10.2f}{result['alloc_peak_kb']:>12.0f}{result['rss_mb']:>9.1f}  "
+              f"{'записанные' if result['recorded'] else 'синтетические'}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=2)
+        print(f"\nБазовая линия сохранена в {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"Нет базовой линии {args.baseline}: сначала запустите с --save-baseline")
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            regressions = check(results, json.load(file), args.threshold)
+        if regressions:
+            print(f"\nРегрессии (порог {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nРегрессий нет (порог {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
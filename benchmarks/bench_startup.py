@@ -0,0 +1,83 @@
+"""
+Замер времени запуска и памяти процесса бота.
+
+Запускает `python -X importtime -c "import main"` несколько раз,
+суммирует время импорта модулей верхнего уровня и показывает самые
+тяжёлые из них, а также пиковую память (RSS) дочернего процесса.
+Тяжёлые библиотеки (dateparser, feedparser, bs4, telegram) при старте
+загружаться не должны — они подключаются при первом использовании.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_startup [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import resource
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ("dateparser", "feedparser", "bs4", "telegram")
+
+
+def run_importtime() -> Tuple[List[Tuple[str, int, int]], int]:
+    """
+    Один запуск интерпретатора с -X importtime.
+    :return: ([(модуль, self мкс, cumulative мкс)], пиковый RSS в КБ).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    # ru_maxrss по дочерним процессам — максимум среди всех запусков (КБ в Linux)
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # После разделителя идёт один пробел, дальше — отступ вложенности
+        rows.append((name.rstrip()[1:], int(self_us), int(cumulative_us)))
+    return rows, max_rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    totals = []
+    rss = 0
+    cumulative: Dict[str, List[int]] = {}
+    rows: List[Tuple[str, int, int]] = []
+    for _ in range(args.runs):
+        rows, rss = run_importtime()
+        # Модули верхнего уровня записаны без отступа, их cumulative не пересекаются
+        totals.append(sum(total for name, _, total in rows if not name.startswith(" ")))
+        # Каждый пакет импортируется один раз; его cumulative включает подмодули
+        for name, _, total in rows:
+            package = name.strip()
+            if "." not in package and package != "main":
+                cumulative.setdefault(package, []).append(total)
+
+    print(f"Время импорта: медиана {statistics.median(totals) / 1000:.1f} мс, "
+          f"мин {min(totals) / 1000:.1f} мс за {args.runs} запусков")
+    print(f"Пиковая память (RSS): {rss / 1024:.1f} МБ")
+    print("\nСамые тяжёлые пакеты:")
+    heaviest = sorted(cumulative.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in heaviest[:args.top]:
+        print(f"  {statistics.median(values) / 1000:8.1f} мс  {name}")
+
+    loaded = {name.strip().split(".")[0] for name, _, _ in rows}
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    if eager:
+        print(f"\nВнимание: при старте загружаются {', '.join(eager)}")
+        sys.exit(1)
+    print(f"\n{', '.join(LAZY_MODULES)} при старте не загружаются")
+
+
+if __name__ == "__main__":
+    main()
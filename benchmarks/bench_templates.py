@@ -0,0 +1,91 @@
+"""
+Стоимость форматирования сообщения на одну вакансию: прежний format_message
+парсера (f-строка, escape_html на каждое поле при каждом вызове) против
+скомпилированного шаблона из templates.json. Для шаблона отдельно показаны
+длинные описания, которые приходится сокращать до лимита Telegram.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_templates
+"""
+import random
+import timeit
+from datetime import datetime, timedelta
+from src.parsers.vacancy import Vacancy, NOT_SPECIFIED
+from src.utils.escapehtml import escape_html
+from src.utils.messagetemplate import load_templates
+
+TITLES = ["Senior Frontend Developer", "React Engineer", "Vue.js Developer (Remote)", "UI Engineer <Team Lead>"]
+COMPANIES = ["ACME", "Globex", "Initech", "Umbrella & Co", "Hooli", None]
+LOCATIONS = ["Germany", "Remote", "Poland", "Москва", "Spain", None]
+TAGS = ["#react", "#vue", "#typescript", "#javascript", "#remote", "#frontend", "#nextjs"]
+EXPERIENCE = ["1–3 years", "3–6 years", "6+ years", None]
+WORDS = "build ship own care accessible fast pages components design & review code <fast>".split()
+
+
+def make_vacancies(count: int, rng: random.Random, description_words: int = 20):
+    start = datetime(2025, 1, 1)
+    return [
+        Vacancy(
+            source="hh",
+            id=str(index),
+            title=rng.choice(TITLES),
+            url=f"https://example.com/vacancy/{index}?utm_source=bot&ref={rng.randint(1, 99)}",
+            published_at=start + timedelta(hours=index),
+            company=rng.choice(COMPANIES),
+            location=rng.choice(LOCATIONS),
+            salary_min=rng.choice([None, 3000, 5000]),
+            salary_max=rng.choice([None, 7000]),
+            salary_currency="EUR",
+            experience=rng.choice(EXPERIENCE),
+            tags=tuple(rng.sample(TAGS, 3)),
+            description=" ".join(rng.choice(WORDS) for _ in range(description_words)),
+        )
+        for index in range(count)
+    ]
+
+
+def legacy_format(vacancy: Vacancy) -> str:
+    """Прежний HHParser.format_message."""
+    hashtags_str = " ".join(escape_html(tag) for tag in vacancy.tags if tag)
+
+    title = escape_html(vacancy.title)
+    description = escape_html(vacancy.description)
+    company = escape_html(vacancy.company or NOT_SPECIFIED)
+    location = escape_html(vacancy.location or NOT_SPECIFIED)
+
+    experience = escape_html(vacancy.experience or NOT_SPECIFIED)
+    salary = escape_html(vacancy.salary)
+
+    return (
+        f"💼 <b>{title}</b>\n"
+        f"📍 Location: {vacancy.flag} {location}\n\n"
+        f"📅 Published: {vacancy.published_date_str}\n\n"
+        f"⌛️ Experience: {experience}\n\n"
+        f"🏢 Company: {company}\n"
+        f"📝 Description: {description}\n\n"
+        f"💵 Salary: {salary}\n\n"
+        f"👉 <a href=\"{vacancy.url}\">APPLY NOW</a>\n\n"
+        f"{hashtags_str}"
+    )
+
+
+def main():
+    rng = random.Random(42)
+    template = load_templates()["hh"]
+
+    print(f"{'вакансий':>9}{'f-строка, мкс':>15}{'шаблон, мкс':>13}{'ускорение':>11}")
+    for count in (1000, 3000, 5000):
+        vacancies = make_vacancies(count, rng)
+        # Минимум из нескольких повторов меньше зависит от шума на машине
+        slow = min(timeit.repeat(lambda: [legacy_format(v) for v in vacancies], number=1, repeat=7)) / count
+        fast = min(timeit.repeat(lambda: [template.render(v) for v in vacancies], number=1, repeat=7)) / count
+        print(f"{count:>9}{slow * 1e6:>15.2f}{fast * 1e6:>13.2f}{slow / fast:>10.2f}x")
+
+    # Длинные описания: прежний путь не укладывался в лимит, шаблон сокращает описание
+    vacancies = make_vacancies(1000, rng, description_words=800)
+    fast = min(timeit.repeat(lambda: [template.render(v) for v in vacancies], number=1, repeat=3)) / len(vacancies)
+    print(f"\nС сокращением до лимита Telegram: {fast * 1e6:.1f} мкс на вакансию")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,61 @@ RSS_FEEDS = os.getenv("RSS_FEEDS")
 JSON_FEED = os.getenv("JSON_FEED")
 CHANNEL_ID = os.getenv("CHANNEL_ID")
 KEYWORDS = os.getenv("KEYWORDS")
+KEYWORDS_MIN_SCORE = int(os.getenv("KEYWORDS_MIN_SCORE", 1))
 CHECK_INTERVAL = 1440
 HH_URL=os.getenv("HH_URL")
 RAPIDKEY=os.getenv("RAPIDKEY")
 RAPIDHOST=os.getenv("RAPIDHOST")
 JOB_URL=os.getenv("JOBAPI_URL")
 TIMEOUT = 10
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", 6))
+PARSER_TIMEOUT = int(os.getenv("PARSER_TIMEOUT", 120))
+HTTP_LIMIT = int(os.getenv("HTTP_LIMIT", 50))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", 8))
+HTTP_KEEPALIVE = int(os.getenv("HTTP_KEEPALIVE", 60))
+HTTP_DNS_TTL = int(os.getenv("HTTP_DNS_TTL", 600))
+TELEGRAM_RATE_PER_MINUTE = int(os.getenv("TELEGRAM_RATE_PER_MINUTE", 20))
+TELEGRAM_BURST = int(os.getenv("TELEGRAM_BURST", 3))
+PUBLISH_QUEUE_SIZE = int(os.getenv("PUBLISH_QUEUE_SIZE", 100))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 50))
+PUBLISH_MAX_RETRIES = int(os.getenv("PUBLISH_MAX_RETRIES", 5))
+TELEGRAM_MESSAGE_LIMIT = 4096
+DIGEST_MODE = os.getenv("DIGEST_MODE", "false").lower() in ("1", "true", "yes", "on")
+DIGEST_GROUP_BY = os.getenv("DIGEST_GROUP_BY", "source")
+DEDUP_FILE = os.getenv("DEDUP_FILE", "dedup_index.json")
+DEDUP_TTL_DAYS = int(os.getenv("DEDUP_TTL_DAYS", 30))
+STATE_DB = os.getenv("STATE_DB", "state.db")
+STATE_LOOKBACK_HOURS = int(os.getenv("STATE_LOOKBACK_HOURS", 6))
+SEEN_TTL_DAYS = int(os.getenv("SEEN_TTL_DAYS", 90))
+CLEAN_BACKEND = os.getenv("CLEAN_BACKEND", "stream")
+DESCRIPTION_PREVIEW = 100
+NORMALIZE_WORKERS = int(os.getenv("NORMALIZE_WORKERS", 0))
+NORMALIZE_EXECUTOR = os.getenv("NORMALIZE_EXECUTOR", "process")
+NORMALIZE_BATCH_SIZE = int(os.getenv("NORMALIZE_BATCH_SIZE", 200))
+HH_PAGE_CONCURRENCY = int(os.getenv("HH_PAGE_CONCURRENCY", 3))
+HH_MAX_RETRIES = int(os.getenv("HH_MAX_RETRIES", 3))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", 1.0))
+HTTP_RETRY_MAX_DELAY = float(os.getenv("HTTP_RETRY_MAX_DELAY", 30))
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", 3))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", 3600))
+BREAKER_MAX_COOLDOWN = float(os.getenv("BREAKER_MAX_COOLDOWN", 24 * 3600))
+HC_MIN_PAGE_SIZE = int(os.getenv("HC_MIN_PAGE_SIZE", 20))
+HC_MAX_PAGE_SIZE = int(os.getenv("HC_MAX_PAGE_SIZE", 100))
+HC_ITEMS_PER_HOUR = int(os.getenv("HC_ITEMS_PER_HOUR", 5))
+HTTP_CACHE_FILE = os.getenv("HTTP_CACHE_FILE", "http_cache.json")
+JSON_CHUNK_SIZE = int(os.getenv("JSON_CHUNK_SIZE", 64 * 1024))
+SOURCES_FILE = os.getenv("SOURCES_FILE", "sources.json")
+SCHEDULE_JITTER = float(os.getenv("SCHEDULE_JITTER", 0.1))
+SCHEDULE_TARGET_ITEMS = int(os.getenv("SCHEDULE_TARGET_ITEMS", 5))
+SELFPROMO_TIMES = os.getenv("SELFPROMO_TIMES", "10:00,20:00")
+CONTROL_HOST = os.getenv("CONTROL_HOST", "127.0.0.1")
+CONTROL_PORT = int(os.getenv("CONTROL_PORT", 8080))
+TEMPLATES_FILE = os.getenv("TEMPLATES_FILE", "templates.json")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() in ("1", "true", "yes", "on")
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", 50))
 WORKINGNOMADS_URL = os.getenv("WORKINGNOMADS")
 HF_URL = os.getenv("HF_URL")
 
@@ -1,6 +1,8 @@
+import argparse
 import logging
 import asyncio
-from src.scheduler import start_scheduler  # Импортируем функцию из scheduler
+from src.scheduler import start_scheduler, run_once  # Импортируем функции из scheduler
+from src.utils.logsetup import setup_logging
 
 # Запуск асинхронной функции через asyncio
 async def main():
@@ -10,5 +12,11 @@ async def main():
 
 # Запуск главной асинхронной функции
 if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO)
-    asyncio.run(main())  # Запуск асинхронной функции main()
\ No newline at end of file
+    setup_logging()  # Единственная настройка логирования для всех модулей
+    arg_parser = argparse.ArgumentParser(description="Бот вакансий для Telegram-канала")
+    arg_parser.add_argument("--run", nargs="+", metavar="SOURCE", help="один раз запустить указанные источники и выйти")
+    args = arg_parser.parse_args()
+    if args.run:
+        asyncio.run(run_once(args.run))
+    else:
+        asyncio.run(main())  # Запуск асинхронной функции main()
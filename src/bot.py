@@ -1,52 +1,56 @@
+import asyncio
 import logging
-import os
-from logging.handlers import RotatingFileHandler
-from telegram import Bot
-from telegram.constants import ParseMode
-from telegram.error import TelegramError
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
 from constants import TELEGRAM_TOKEN, CHANNEL_ID
+from constants import TELEGRAM_RATE_PER_MINUTE, TELEGRAM_BURST, PUBLISH_QUEUE_SIZE, PUBLISH_MAX_RETRIES
+from constants import TELEGRAM_MESSAGE_LIMIT
+from src.utils.escapehtml import escape_html
+from src.utils.telegramhtml import truncate_html, visible_length
+from src.utils.metrics import span, observe, TELEGRAM_MESSAGES
 import random
 
-# Настройка логирования
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
+# Разделитель вакансий в дайджесте
+DIGEST_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
 logger = logging.getLogger(__name__)
 
-# Настройка ротации логов
-log_dir = "logs"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-
-log_file = os.path.join(log_dir, "bot.log")
-handler = RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=5)  # 5 MB на файл, 5 резервных копий
-logging.basicConfig(
-    level=getattr(logging, log_level, logging.INFO),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),  # Вывод в консоль
-        handler  # Ротация логов в файл
-    ]
-)
+# Бот создаётся при первом обращении: библиотека telegram
+# не загружается, пока планировщик ждёт времени запуска
+_bot = None
 
-# Инициализация бота
-bot = Bot(token=TELEGRAM_TOKEN)
+def get_bot():
+    """
+    Возвращает экземпляр бота, создавая его при первом вызове.
+    """
+    global _bot
+    if _bot is None:
+        from telegram import Bot
+        _bot = Bot(token=TELEGRAM_TOKEN)
+    return _bot
 
 async def get_updates() -> None:
     """
     Асинхронно получает обновления от Telegram бота.
     """
+    from telegram.error import TelegramError
     try:
-        updates = await bot.get_updates()
+        updates = await get_bot().get_updates()
         for update in updates:
             if update.message and update.message.chat:
-                logger.info(f"Сообщение от чата: {update.message.chat.id}")
+                logger.info("Сообщение от чата: %s", update.message.chat.id)
             else:
                 logger.debug("Обновление не содержит сообщения или чата")
     except TelegramError as e:
-        logger.error(f"Ошибка при получении обновлений: {e}")
+        logger.error("Ошибка при получении обновлений: %s", e)
     except Exception as e:
-        logger.error(f"Неожиданная ошибка при получении обновлений: {e}")
+        logger.error("Неожиданная ошибка при получении обновлений: %s", e)
 
 async def send_selfpromo() -> None:
+    from telegram.constants import ParseMode
+    from telegram.error import TelegramError
     messages = [
         "🚀 *Looking for a remote frontend job?*\n\n"
         "We post fresh frontend positions daily from multiple trusted sources.\n\n"
@@ -66,33 +70,250 @@ async def send_selfpromo() -> None:
     ]
     try:
         message = random.choice(messages)
-        response = await bot.send_message(
+        response = await get_bot().send_message(
             chat_id=CHANNEL_ID,
             text=message,
             parse_mode=ParseMode.MARKDOWN,
             disable_web_page_preview=True
         )
-        logger.info(f"Самореклама отправлена: {response.message_id}")
+        logger.info("Самореклама отправлена: %s", response.message_id)
     except TelegramError as e:
-        logger.error(f"Ошибка при отправке саморекламы: {e}")
+        logger.error("Ошибка при отправке саморекламы: %s", e)
     except Exception as e:
-        logger.error(f"Неожиданная ошибка при саморекламе: {e}")
+        logger.error("Неожиданная ошибка при саморекламе: %s", e)
 
-async def send_message(message: str) -> None:
+class TokenBucket:
     """
-    Асинхронно отправляет отформатированное сообщение в Telegram канал.
-    
-    :param message: Готовое сообщение в формате Markdown.
+    Ограничитель скорости «ведро токенов»: rate токенов в секунду,
+    не больше capacity подряд.
     """
-    try:
-        response = await bot.send_message(
-            chat_id=CHANNEL_ID,
-            text=message,
-            parse_mode=ParseMode.HTML,
-            disable_web_page_preview=True
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """
+        Останавливает выдачу токенов на seconds секунд (flood wait от Telegram).
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    # После паузы отправка разрешается сразу
+                    self.tokens = max(self.tokens, 1.0)
+                    self.updated = time.monotonic()
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class PublishQueue:
+    """
+    Очередь публикации в канал с учётом лимитов Telegram.
+    Сообщения отправляются так быстро, как позволяет канал:
+    темп задаёт TokenBucket, RetryAfter выдерживается ровно столько,
+    сколько просит Telegram, сетевые ошибки повторяются.
+    """
+    def __init__(
+        self,
+        rate_per_minute: int = TELEGRAM_RATE_PER_MINUTE,
+        burst: int = TELEGRAM_BURST,
+        maxsize: int = PUBLISH_QUEUE_SIZE,
+        max_retries: int = PUBLISH_MAX_RETRIES
+    ):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.bucket = TokenBucket(rate_per_minute / 60, burst)
+        self.max_retries = max_retries
+        self.sent = 0
+        self.failed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def put(self, message: str, on_sent: Optional[Callable[[], None]] = None, group: str = "") -> None:
+        """
+        Ставит сообщение в очередь. Если очередь заполнена, ждёт освобождения места.
+        :param on_sent: Вызывается после успешной отправки сообщения.
+        :param group: Группа для дайджеста; при отправке по одному сообщению не используется.
+        """
+        await self.queue.put((message, time.monotonic(), on_sent))
+
+    async def close(self) -> None:
+        """
+        Дожидается отправки всех сообщений и останавливает обработчик.
+        """
+        await self.queue.join()
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        average = self.total_latency / self.sent if self.sent else 0.0
+        logger.info(
+            "Публикация завершена: отправлено %s, ошибок %s, "
+            "средняя задержка %.2f сек., максимальная %.2f сек.",
+            self.sent, self.failed, average, self.max_latency
         )
-        logger.info(f"Сообщение отправлено в канал {CHANNEL_ID}: {response.message_id}")
-    except TelegramError as e:
-        logger.error(f"Ошибка Telegram при отправке сообщения: {e}")
-    except Exception as e:
-        logger.error(f"Неожиданная ошибка при отправке сообщения: {e}")
\ No newline at end of file
+
+    async def _run(self) -> None:
+        while True:
+            message, enqueued, on_sent = await self.queue.get()
+            try:
+                if await self._publish(message, enqueued) and on_sent:
+                    on_sent()
+            except Exception as e:
+                self.failed += 1
+                logger.error("Неожиданная ошибка при отправке сообщения: %s", e)
+            finally:
+                self.queue.task_done()
+
+    async def _publish(self, message: str, enqueued: float) -> bool:
+        from telegram.constants import ParseMode
+        from telegram.error import TelegramError, RetryAfter, NetworkError, BadRequest
+        attempt = 0
+        while True:
+            with span("throttle", "telegram"):
+                await self.bucket.acquire()
+            started = time.monotonic()
+            try:
+                with span("send", "telegram"):
+                    response = await get_bot().send_message(
+                        chat_id=CHANNEL_ID,
+                        text=message,
+                        parse_mode=ParseMode.HTML,
+                        disable_web_page_preview=True
+                    )
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                TELEGRAM_MESSAGES.inc("flood_wait")
+                logger.warning("Telegram просит подождать %s сек. (flood wait)", retry_after)
+                self.bucket.pause(float(retry_after))
+                continue
+            except BadRequest as e:
+                self.failed += 1
+                TELEGRAM_MESSAGES.inc("failed")
+                logger.error("Telegram отклонил сообщение: %s", e)
+                return False
+            except NetworkError as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    self.failed += 1
+                    TELEGRAM_MESSAGES.inc("failed")
+                    logger.error("Сообщение не отправлено после %s повторов: %s", self.max_retries, e)
+                    return False
+                delay = 2 ** attempt
+                TELEGRAM_MESSAGES.inc("retry")
+                logger.warning("Сетевая ошибка Telegram (%s), повтор %s/%s через %s сек.", e, attempt, self.max_retries, delay)
+                await asyncio.sleep(delay)
+                continue
+            except TelegramError as e:
+                self.failed += 1
+                TELEGRAM_MESSAGES.inc("failed")
+                logger.error("Ошибка Telegram при отправке сообщения: %s", e)
+                return False
+
+            finished = time.monotonic()
+            latency = finished - enqueued
+            self.sent += 1
+            TELEGRAM_MESSAGES.inc("sent")
+            observe("latency", latency, "telegram")
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            logger.info(
+                "Сообщение отправлено в канал %s: %s "
+                "(запрос %.2f сек., с момента постановки %.2f сек., в очереди %s)",
+                CHANNEL_ID, response.message_id, finished - started, latency, self.queue.qsize()
+            )
+            return True
+
+@dataclass
+class Digest:
+    """Накапливаемый дайджест одной группы."""
+    parts: List[str]
+    length: int
+    callbacks: List[Callable[[], None]] = field(default_factory=list)
+
+class DigestQueue:
+    """
+    Режим дайджеста: собирает отформатированные вакансии одной группы
+    (источник или тег) в сообщения до TELEGRAM_MESSAGE_LIMIT символов
+    и передаёт их в PublishQueue. Вакансии склеиваются только целиком,
+    поэтому теги HTML не разрываются; слишком длинная вакансия обрезается
+    через truncate_html. Интерфейс совпадает с PublishQueue.
+    """
+    def __init__(self, publisher: PublishQueue, limit: int = TELEGRAM_MESSAGE_LIMIT):
+        self.publisher = publisher
+        self.limit = limit
+        self.digests: Dict[str, Digest] = {}
+        self.separator_length = visible_length(DIGEST_SEPARATOR)
+        self.packed = 0
+        self.messages = 0
+
+    def start(self) -> None:
+        self.publisher.start()
+
+    def header(self, group: str) -> str:
+        return f"📬 <b>{escape_html(group)}</b>" if group else ""
+
+    async def put(self, message: str, on_sent: Optional[Callable[[], None]] = None, group: str = "") -> None:
+        """
+        Добавляет вакансию в дайджест группы. Если она не помещается,
+        накопленный дайджест уходит в очередь отправки.
+        """
+        header_length = visible_length(self.header(group))
+        message = truncate_html(message, self.limit - header_length - self.separator_length)
+        length = self.separator_length + visible_length(message)
+
+        digest = self.digests.get(group)
+        if digest is not None and digest.length + length > self.limit:
+            await self._flush(group)
+            digest = None
+        if digest is None:
+            digest = self.digests[group] = Digest(parts=[], length=header_length)
+
+        digest.parts.append(message)
+        digest.length += length
+        if on_sent:
+            digest.callbacks.append(on_sent)
+        self.packed += 1
+
+    async def _flush(self, group: str) -> None:
+        digest = self.digests.pop(group)
+        header = self.header(group)
+        text = DIGEST_SEPARATOR.join([header] + digest.parts if header else digest.parts)
+
+        def on_sent() -> None:
+            for callback in digest.callbacks:
+                callback()
+
+        self.messages += 1
+        await self.publisher.put(text, on_sent=on_sent)
+
+    async def close(self) -> None:
+        """
+        Отправляет неполные дайджесты и закрывает очередь публикации.
+        """
+        for group in list(self.digests):
+            await self._flush(group)
+        await self.publisher.close()
+        logger.info("Дайджест: %s вакансий упаковано в %s сообщений", self.packed, self.messages)
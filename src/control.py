@@ -0,0 +1,52 @@
+import logging
+from typing import TYPE_CHECKING, Optional
+from constants import CONTROL_HOST, CONTROL_PORT
+from src.utils.metrics import render_metrics, CONTENT_TYPE
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+async def start_control_server(scheduler) -> Optional["web.AppRunner"]:
+    """
+    Поднимает локальный HTTP-сервер управления планировщиком:
+      GET  /sources        — расписания источников, следующий запуск, последний улов;
+      POST /run/{source}   — внеочередной запуск источника;
+      GET  /metrics        — счётчики и гистограммы этапов в формате Prometheus.
+    Слушает CONTROL_HOST:CONTROL_PORT (по умолчанию только localhost); CONTROL_PORT=0 отключает сервер.
+    :return: AppRunner для остановки или None, если сервер отключён или не запустился.
+    """
+    if not CONTROL_PORT:
+        return None
+    # aiohttp.web заметно увеличивает время импорта, поэтому загружается только здесь
+    from aiohttp import web
+
+    async def sources(request: "web.Request") -> "web.Response":
+        return web.json_response(scheduler.status())
+
+    async def run_source(request: "web.Request") -> "web.Response":
+        name = request.match_info["source"]
+        if not scheduler.trigger(name):
+            return web.json_response({"error": f"Источник {name} не найден или выключен"}, status=404)
+        return web.json_response({"triggered": name}, status=202)
+
+    async def metrics(request: "web.Request") -> "web.Response":
+        return web.Response(body=render_metrics().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/sources", sources)
+    app.router.add_post("/run/{source}", run_source)
+    app.router.add_get("/metrics", metrics)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, CONTROL_HOST, CONTROL_PORT).start()
+    except OSError as e:
+        logger.error("Не удалось запустить сервер управления на %s:%s: %s", CONTROL_HOST, CONTROL_PORT, e)
+        await runner.cleanup()
+        return None
+    logger.info("Сервер управления: http://%s:%s (POST /run/<источник>, GET /metrics)", CONTROL_HOST, CONTROL_PORT)
+    return runner
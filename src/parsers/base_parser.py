@@ -1,18 +1,85 @@
+import aiohttp
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Tuple, Optional
+from typing import AsyncIterator, Dict, List, Mapping, Optional, Tuple
+from src.parsers.vacancy import Vacancy
+from src.utils.messagetemplate import MessageTemplate, get_template
+from src.utils.httpclient import create_session
+from src.utils.httpcache import get_http_cache
+from src.utils.sources import SourceConfig
 
 class VacancyParser(ABC):
-    def __init__(self, last_published_date: Optional[datetime], last_published_file: str):
+    # Тип парсера, под которым он зарегистрирован (задаёт декоратор register)
+    parser_type = "default"
+
+    def __init__(
+        self,
+        last_published_date: Optional[datetime],
+        state_key: str,
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         self.last_published_date = last_published_date
-        self.last_published_file = last_published_file
+        self.state_key = state_key
+        self.session = session
+        # Сколько запросов источник может выполнять одновременно (None — на усмотрение парсера)
+        self.concurrency: Optional[int] = None
+        # Шаблон сообщения: по имени источника, затем по типу парсера, иначе "default"
+        self.template: Optional[MessageTemplate] = None
+        # Валидаторы полученных лент (заголовки ответа, размер) по URL: в HTTP-кэш
+        # попадают через store_validators, только когда лента обработана целиком
+        self.validators: Dict[str, Tuple[Mapping[str, str], int]] = {}
+
+    @classmethod
+    def from_config(
+        cls,
+        source: SourceConfig,
+        last_published_date: Optional[datetime],
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> "VacancyParser":
+        """
+        Создаёт парсер по описанию источника. Все парсеры принимают
+        (url, last_published_date, state_key), а keywords, session и options —
+        как именованные аргументы.
+        """
+        return cls(source.url, last_published_date, source.name, keywords=source.keywords, session=session, **source.options)
+
+    @asynccontextmanager
+    async def http_session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        Возвращает общую HTTP-сессию, переданную планировщиком.
+        Если её нет (парсер запущен отдельно), открывает временную.
+        """
+        if self.session is not None and not self.session.closed:
+            yield self.session
+            return
+        async with create_session() as session:
+            yield session
+
+    def store_validators(self, url: str) -> None:
+        """
+        Сохраняет ETag / Last-Modified ленты url после того, как все её записи
+        переданы дальше. Если запуск прервётся раньше, ленту запросим заново
+        полностью, а не получим 304 и не потеряем необработанные записи.
+        """
+        validators = self.validators.pop(url, None)
+        if validators:
+            get_http_cache().store(url, *validators)
 
     @abstractmethod
-    async def fetch_vacancies(self) -> List[Tuple[str, str, dict]]:
-        """Возвращает список вакансий: (title, link, metadata)."""
+    def stream(self) -> AsyncIterator[Vacancy]:
+        """
+        Асинхронно отдаёт новые вакансии по мере получения.
+        Дата последней публикации сохраняется, только если поток прочитан до конца.
+        """
         pass
 
-    @abstractmethod
-    def format_message(self, title: str, link: str, metadata: dict) -> str:
-        """Форматирует сообщение для вакансии."""
-        pass
\ No newline at end of file
+    async def fetch_vacancies(self) -> List[Vacancy]:
+        """Возвращает список новых вакансий (обёртка над stream() для совместимости)."""
+        return [vacancy async for vacancy in self.stream()]
+
+    def format_message(self, vacancy: Vacancy) -> str:
+        """Форматирует сообщение для вакансии по шаблону источника (templates.json)."""
+        if self.template is None:
+            self.template = get_template(self.state_key, self.parser_type)
+        return self.template.render(vacancy)
@@ -1,50 +1,168 @@
 import aiohttp
+import asyncio
+import json
 import logging
-import os
 from datetime import datetime, timedelta
-from typing import List, Tuple, Optional, Dict
-from dateparser import parse
+from typing import AsyncIterator, List, Tuple, Optional, Dict
 from src.utils.lastpublished import save_last_published_date
-from src.utils.dateutils import to_utc, is_newer, update_last_published_date
+from src.utils.dateutils import to_utc, is_newer, update_last_published_date, parse_date
 from src.parsers.base_parser import VacancyParser
+from src.parsers.registry import register
+from src.parsers.vacancy import Vacancy, parse_amount, preview
 from src.utils.cleandescription import cleandescription
-from src.utils.getflags import get_flag_emoji
+from constants import DESCRIPTION_PREVIEW, HH_PAGE_CONCURRENCY, HH_MAX_RETRIES
 from src.utils.normalizetags import normalize_tag
-from src.utils.escapehtml import escape_html
+from src.utils.metrics import span
+from src.utils.httpretry import request
+from src.utils.logsetup import SampledLog
 
 
-# Настройка логирования
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(
-    level=getattr(logging, log_level, logging.INFO),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
 logger = logging.getLogger(__name__)
 
+@register("hh")
 class HHParser(VacancyParser):
     def __init__(
         self,
         url: str,
         last_published_date: Optional[datetime],
-        last_published_file: str
+        state_key: str,
+        *,
+        keywords: str = "",
+        session: Optional[aiohttp.ClientSession] = None
     ):
-        super().__init__(last_published_date, last_published_file)
+        super().__init__(last_published_date, state_key, session)
         self.api_url = url
-        self.search_text = 'frontend'
+        self.search_text = keywords or "frontend"
         self.schedule = 'remote'
-
-    async def fetch_vacancies(self) -> List[Tuple[str, str, Dict]]:
-        vacancies = []
+        self.concurrency = HH_PAGE_CONCURRENCY
+        # Сообщения по отдельным вакансиям — выборочно, итог за запуск пишет stream
+        self.added = SampledLog(logger, "Добавлена вакансия: %s, %s")
+        self.skipped = SampledLog(logger, "Вакансия '%s' не прошла фильтрацию: date_published=%s, last_published_date=%s")
+
+    async def fetch_page(self, session: aiohttp.ClientSession, params: Dict, page: int) -> Optional[Dict]:
+        """
+        Запрашивает одну страницу поиска. Повторы на 429 (с учётом Retry-After)
+        и временных ошибках выполняет общий слой запросов.
+        :return: JSON ответа или None при ошибке.
+        """
+        page_params = dict(params, page=page)
+        logger.info("Запрос к API HeadHunter: %s, страница %s, params=%s", self.api_url, page, page_params)
+        try:
+            with span("fetch"):
+                async with request(
+                    session, 'GET', self.api_url, self.state_key,
+                    retries=HH_MAX_RETRIES, params=page_params, ssl=False, timeout=10
+                ) as response:
+                    response.raise_for_status()
+                    body = await response.read()
+            with span("decode"):
+                data = json.loads(body)
+        except aiohttp.ClientResponseError as e:
+            logger.error("HTTP-ошибка при запросе API %s: %s, %s", self.api_url, e.status, e.message)
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("Ошибка при запросе API %s, страница %s: %s", self.api_url, page, e)
+            if "SSL" in str(e):
+                logger.warning("SSL-ошибка. Проверка SSL отключена. Рекомендуется обновить сертификаты.")
+            return None
+        except ValueError as e:
+            logger.error("Ошибка декодирования JSON от %s: %s", self.api_url, e)
+            return None
+
+        if data is None:
+            logger.error("Ответ API равен None")
+        return data
+
+    def handle_page(self, data: Dict, page: int, vacancies: List[Vacancy], new_last_published_date: Optional[datetime]) -> Optional[datetime]:
+        """
+        Разбирает вакансии одной страницы и добавляет новые в vacancies.
+        :return: Обновлённая дата последней публикации.
+        """
+        items = data.get('items', [])
+        logger.debug("Получено %s вакансий на странице %s", len(items), page)
+        if not isinstance(items, list):
+            logger.error("Неожиданный формат вакансий на странице %s: %s", page, type(items))
+            return new_last_published_date
+
+        for item in items:
+            title = item.get('name') or ''
+            link = item.get('alternate_url', '#')
+            pub_date_str = item.get('published_at', '')
+
+            # Парсинг даты
+            date_published = None
+            if pub_date_str:
+                try:
+                    parsed_date = parse_date(pub_date_str)
+                    if parsed_date:
+                        date_published = to_utc(parsed_date)
+                    else:
+                        logger.warning("Не удалось разобрать дату: %s", pub_date_str)
+                        continue  # Пропускаем вакансию без даты
+                except Exception as e:
+                    logger.warning("Ошибка при обработке даты: %s, %s", pub_date_str, e)
+                    continue  # Пропускаем вакансию без даты
+            else:
+                logger.warning("Отсутствует дата публикации")
+                continue  # Пропускаем вакансию без даты
+
+            # Фильтрация только по дате
+            if not is_newer(date_published, self.last_published_date):
+                self.skipped(title, date_published, self.last_published_date)
+                continue
+
+            snippet = item.get('snippet') or {}
+            raw_description = snippet.get('responsibility') or snippet.get('requirement') or ''
+            employer = item.get('employer') or {}
+            salary_data = item.get('salary') or {}
+            experience = (item.get('experience') or {}).get('name') or None
+            area = item.get('area', {}) or {}
+            location = (area.get('name') or '').strip()
+
+            # Хештеги: локация и опыт
+            hashtags = []
+            location_tag = normalize_tag(location)  # например #fr_moscow
+            if location_tag:
+                hashtags.append(location_tag)
+            experience_tag = normalize_tag(experience.lower() if experience else '')  # например #fr_junior
+            if experience_tag:
+                hashtags.append(experience_tag)
+
+            logger.debug("Вакансия '%s': salary=%s, published_at=%s", title, salary_data, pub_date_str)
+            description = cleandescription(raw_description, max_chars=DESCRIPTION_PREVIEW)
+
+            vacancy = Vacancy(
+                source=self.state_key,
+                id=str(item.get('id') or link),
+                title=title,
+                url=link,
+                published_at=date_published,
+                company=employer.get('name') or None,
+                location=location or None,
+                salary_min=parse_amount(salary_data.get('from')),
+                salary_max=parse_amount(salary_data.get('to')),
+                salary_currency=salary_data.get('currency') or None,
+                experience=experience,
+                tags=tuple(hashtags),
+                description=preview(description)
+            )
+            vacancies.append(vacancy)
+            new_last_published_date = update_last_published_date(new_last_published_date, date_published)
+            self.added(title, link)
+
+        return new_last_published_date
+
+    async def stream(self) -> AsyncIterator[Vacancy]:
+        count = 0
         new_last_published_date = self.last_published_date
 
         if not self.api_url:
             logger.error("HH_API_URL не указан в .env")
-            return []
+            return
 
         yesterday = (datetime.now() - timedelta(days=1)).isoformat()
-        logger.info(f"Дата начала поиска: {yesterday}")
-        logger.debug(f"Последняя сохранённая дата: {self.last_published_date}")
+        logger.info("Дата начала поиска: %s", yesterday)
+        logger.debug("Последняя сохранённая дата: %s", self.last_published_date)
 
         params = {
             "text": self.search_text,
@@ -54,150 +172,53 @@ class HHParser(VacancyParser):
             "per_page": 100
         }
 
-        async with aiohttp.ClientSession() as session:
-            page = 0
-            while True:
-                params["page"] = page
-                logger.info(f"Запрос к API HeadHunter: {self.api_url}, страница {page}, params={params}")
-                try:
-                    async with session.request('GET', self.api_url, params=params, ssl=False, timeout=10) as response:
-                        response.raise_for_status()
-                        data = await response.json()
-                except aiohttp.ClientResponseError as e:
-                    logger.error(f"HTTP-ошибка при запросе API {self.api_url}: {e.status}, {e.message}")
-                    return []
-                except aiohttp.ClientError as e:
-                    logger.error(f"Ошибка при запросе API {self.api_url}: {e}")
-                    if "SSL" in str(e):
-                        logger.warning("SSL-ошибка. Проверка SSL отключена. Рекомендуется обновить сертификаты.")
-                    return []
-                except ValueError as e:
-                    logger.error(f"Ошибка декодирования JSON от {self.api_url}: {e}")
-                    return []
-
-                if data is None:
-                    logger.error("Ответ API равен None")
-                    return []
-                items = data.get('items', [])
-                logger.debug(f"Получено {len(items)} вакансий на странице {page}")
-                if not isinstance(items, list) or not items:
-                    logger.info(f"Нет больше вакансий на странице {page}")
-                    break
-
-                for item in items:
-                    title = item.get('name') or ''
-                    snippet = item.get('snippet') or {}
-                    raw_description = snippet.get('responsibility') or snippet.get('requirement') or ''
-                    employer = item.get('employer') or {}
-                    company = employer.get('name', 'Не указано')
-                    salary_data = item.get('salary') or {}
-                    salarymin = salary_data.get('from', None)
-                    salarymax = salary_data.get('to', None)
-                    currency = salary_data.get('currency', '')
-                    pub_date_str = item.get('published_at', '')
-                    experience_data = item.get('experience') or {}
-                    experience = experience_data.get('name', 'Не указано')
-                    link = item.get('alternate_url', '#')
-                    area = item.get('area', {}) or {}
-                    location = area.get('name', '').strip()
-
-                    # Парсинг даты
-                    date_published = None
-                    formatted_date = "Not specified"
-                    if pub_date_str:
-                        try:
-                            parsed_date = parse(pub_date_str, settings={'TIMEZONE': 'UTC', 'TO_TIMEZONE': 'UTC'})
-                            if parsed_date:
-                                date_published = to_utc(parsed_date)
-                                formatted_date = date_published.strftime('%d %B %Y')
-                            else:
-                                logger.warning(f"Не удалось разобрать дату: {pub_date_str}")
-                                continue  # Пропускаем вакансию без даты
-                        except Exception as e:
-                            logger.warning(f"Ошибка при обработке даты: {pub_date_str}, {e}")
-                            continue  # Пропускаем вакансию без даты
-                    else:
-                        logger.warning("Отсутствует дата публикации")
-                        continue  # Пропускаем вакансию без даты
-
-                    # Формируем теги после того, как есть experience и location
-                    location_tag = normalize_tag(location)  # например #fr_moscow
-                    experience_tag = normalize_tag(experience.lower())  # например #fr_junior
-
-                    # Получаем эмодзи флага для локации
-                    flag = get_flag_emoji(location)
-
-                    # Формируем список хештегов (максимум 2 — локация и опыт)
-                    hashtags = []
-                    if location_tag:
-                        hashtags.append(location_tag)
-                    if experience_tag:
-                        hashtags.append(experience_tag)
-
-                    # Дебаг
-                    logger.debug(f"Вакансия '{title}': salarymin={salarymin}, salarymax={salarymax}, currency={currency}, published_at={pub_date_str}")
-                    description = cleandescription(raw_description)
-
-                    # Формирование зарплаты
-                    if salarymin and salarymax:
-                        salary = f"{salarymin}–{salarymax} {currency}"
-                    elif salarymin:
-                        salary = f"from {salarymin} {currency}"
-                    elif salarymax:
-                        salary = f"to {salarymax} {currency}"
-                    else:
-                        salary = "Not specified"
-
-                    metadata = {
-                        "description": description[:100] + "..." if len(description) > 100 else description,
-                        "experience": experience,
-                        "company": company,
-                        "published_date": date_published.strftime('%Y-%m-%d %H:%M:%S'),
-                        "published_date_str": formatted_date,
-                        "salary": salary,
-                        "location": location or "Not specified",
-                        "flag": flag or "",
-                        "hashtags": hashtags
-                    }
-
-                    # Фильтрация только по дате
-                    if date_published and is_newer(date_published, self.last_published_date):
-                        vacancies.append((title, link, metadata))
-                        new_last_published_date = update_last_published_date(new_last_published_date, date_published)
-                        logger.info(f"Добавлена вакансия: {title}, {link}")
-                    else:
-                        logger.debug(f"Вакансия '{title}' не прошла фильтрацию: date_published={date_published}, last_published_date={self.last_published_date}")
-
-                page += 1
+        async with self.http_session() as session:
+            # Первая страница сообщает общее число страниц (pages)
+            first = await self.fetch_page(session, params, 0)
+            if first is None:
+                return
+            pages = first.get('pages') or 1
+            page_vacancies = []
+            new_last_published_date = self.handle_page(first, 0, page_vacancies, new_last_published_date)
+            for vacancy in page_vacancies:
+                count += 1
+                yield vacancy
+            logger.info("HeadHunter: найдено %s вакансий на %s страницах", first.get('found', 0), pages)
+
+            # Остальные страницы запрашиваются параллельно и обрабатываются по мере получения
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch_limited(page: int) -> Tuple[int, Optional[Dict]]:
+                async with semaphore:
+                    return page, await self.fetch_page(session, params, page)
+
+            incomplete = False
+            tasks = [asyncio.create_task(fetch_limited(page)) for page in range(1, pages)]
+            try:
+                for next_page in asyncio.as_completed(tasks):
+                    page, data = await next_page
+                    if data is None:
+                        incomplete = True
+                        continue
+                    page_vacancies = []
+                    new_last_published_date = self.handle_page(data, page, page_vacancies, new_last_published_date)
+                    for vacancy in page_vacancies:
+                        count += 1
+                        yield vacancy
+            finally:
+                # Потребитель мог остановить поток раньше: незавершённые запросы отменяем
+                for task in tasks:
+                    task.cancel()
+
+        if incomplete:
+            # Вакансии с пропущенных страниц могут быть старше новой даты: дату не сдвигаем,
+            # повторы в следующем запуске отсекаются по ID
+            logger.warning("Не все страницы HeadHunter получены, дата последней публикации не обновлена")
+            new_last_published_date = None
 
         if new_last_published_date:
             self.last_published_date = new_last_published_date
-            save_last_published_date(new_last_published_date, self.last_published_file)
-
-        logger.info(f"Итоговое количество вакансий: {len(vacancies)}")
-        return vacancies
-
-    def format_message(self, title: str, link: str, metadata: Dict) -> str:
-        hashtags = metadata.get("hashtags", [])
-        hashtags_str = " ".join(escape_html(tag) for tag in hashtags if tag)
-
-        title = escape_html(title)
-        description = escape_html(metadata["description"])
-        company = escape_html(metadata.get("company", "Not specified"))
-        location = escape_html(metadata.get("location", "Not specified"))
-        flag = metadata.get("flag", "")
-
-        experience = escape_html(metadata.get("experience", "Not specified"))
-        salary = escape_html(metadata.get("salary", "Not specified"))
-
-        return (
-            f"💼 <b>{title}</b>\n"
-            f"📍 Location: {flag} {location}\n\n"
-            f"📅 Published: {metadata['published_date_str']}\n\n"
-            f"⌛️ Experience: {experience}\n\n"
-            f"🏢 Company: {company}\n"
-            f"📝 Description: {description}\n\n"
-            f"💵 Salary: {salary}\n\n"
-            f"👉 <a href=\"{link}\">APPLY NOW</a>\n\n"
-            f"{hashtags_str}"
-        )
+            save_last_published_date(new_last_published_date, self.state_key)
+
+        self.skipped.summary("HeadHunter: не прошли фильтр по дате: %d")
+        logger.info("Итоговое количество вакансий: %s", count)
@@ -1,50 +1,180 @@
 import aiohttp
+import asyncio
+import json
 import logging
-import os
-from datetime import datetime
-from typing import List, Tuple, Optional, Dict
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Tuple, Optional, Dict
 from src.utils.lastpublished import save_last_published_date
-from src.utils.dateutils import to_utc, is_newer, update_last_published_date
+from src.utils.dateutils import to_utc, is_newer, update_last_published_date, parse_date
 from src.parsers.base_parser import VacancyParser
-from dateparser import parse
+from src.parsers.registry import register
+from src.parsers.vacancy import Vacancy, parse_amount, preview
 from src.utils.cleandescription import cleandescription
-from src.utils.getflags import get_flag_emoji
+from constants import DESCRIPTION_PREVIEW, HC_MIN_PAGE_SIZE, HC_MAX_PAGE_SIZE, HC_ITEMS_PER_HOUR
 from src.utils.normalizetags import normalize_tag
-from src.utils.escapehtml import escape_html
+from src.utils.metrics import span
+from src.utils.httpretry import request
+from src.utils.logsetup import SampledLog
 
 
-# Настройка логирования
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(
-    level=getattr(logging, log_level, logging.INFO),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
 logger = logging.getLogger(__name__)
 
+@register("hiringcafe")
 class HiringCafeParser(VacancyParser):
     def __init__(
         self,
         url: str,
         last_published_date: Optional[datetime],
-        last_published_file: str,
-        keywords: str = "frontend"
+        state_key: str,
+        *,
+        keywords: str = "",
+        session: Optional[aiohttp.ClientSession] = None
     ):
-        super().__init__(last_published_date, last_published_file)
+        super().__init__(last_published_date, state_key, session)
         self.api_url = url
-        self.keywords = keywords
+        self.keywords = keywords or "frontend"
         self.workplace_type = 'remote'
-
-    async def fetch_vacancies(self) -> List[Tuple[str, str, Dict]]:
-        vacancies = []
+        # Сообщения по отдельным вакансиям — выборочно, итог за запуск пишет stream
+        self.added = SampledLog(logger, "Добавлена вакансия: %s, %s")
+        self.skipped = SampledLog(logger, "Пропущена вакансия: %s (дата: %s, тип: %s)")
+
+    def page_size(self) -> int:
+        """
+        Размер страницы по давности последней публикации: после долгого перерыва
+        новых вакансий много и крупные страницы экономят запросы,
+        при частых запусках хватает небольшой первой страницы.
+        """
+        if self.last_published_date is None:
+            return HC_MAX_PAGE_SIZE
+        hours = (datetime.now(timezone.utc) - to_utc(self.last_published_date)).total_seconds() / 3600
+        expected = int(hours * HC_ITEMS_PER_HOUR)
+        return max(HC_MIN_PAGE_SIZE, min(HC_MAX_PAGE_SIZE, expected))
+
+    async def fetch_page(self, session: aiohttp.ClientSession, payload: Dict, page: int) -> Optional[List[Dict]]:
+        """
+        Запрашивает одну страницу поиска.
+        :return: Список результатов или None при ошибке.
+        """
+        page_payload = dict(payload, page=page)
+        logger.info("Запрос к API Hiring Cafe: %s, страница %s, payload=%s", self.api_url, page, page_payload)
+        try:
+            with span("fetch"):
+                async with request(session, 'POST', self.api_url, self.state_key, json=page_payload, ssl=False, timeout=10) as response:
+                    content = await response.text()
+                    if response.status == 401:
+                        logger.error("Ошибка авторизации (401): Возможно, требуется токен API Hiring Cafe.")
+                        return None
+                    response.raise_for_status()
+            try:
+                with span("decode"):
+                    data = json.loads(content)
+            except ValueError as e:
+                logger.error("Ошибка декодирования JSON: %s, начало ответа: %.200s", e, content)
+                return None
+        except aiohttp.ClientResponseError as e:
+            logger.error("HTTP-ошибка при запросе API %s: %s, %s", self.api_url, e.status, e.message)
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("Ошибка при запросе API %s: %s", self.api_url, e)
+            if "SSL" in str(e):
+                logger.warning("SSL-ошибка. Проверка SSL отключена. Рекомендуется обновить сертификаты.")
+            return None
+
+        if not isinstance(data, dict) or 'results' not in data:
+            logger.error("Неожиданный формат данных API: %s", type(data))
+            return None
+        return data.get('results', [])
+
+    def handle_page(self, results: List[Dict], vacancies: List[Vacancy], new_last_published_date: Optional[datetime]) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """
+        Разбирает вакансии одной страницы и добавляет новые в vacancies.
+        :return: (обновлённая дата последней публикации, самая ранняя дата на странице).
+        """
+        oldest = None
+        for item in results:
+            processed_data = item.get('v5_processed_job_data', {})
+            title = processed_data.get('core_job_title', 'Без названия')
+            link = item.get('apply_url', '#')
+            workplace_type = processed_data.get('workplace_type', '').lower()
+            date_published_str = processed_data.get('estimated_publish_date', '')
+
+            # Парсинг даты
+            date_published = None
+            if date_published_str:
+                try:
+                    parsed_date = parse_date(date_published_str)
+                    if parsed_date:
+                        date_published = to_utc(parsed_date)
+                    else:
+                        logger.warning("Не удалось разобрать дату: %s", date_published_str)
+                except Exception as e:
+                    logger.warning("Ошибка при обработке даты: %s, %s", date_published_str, e)
+
+            if date_published:
+                oldest = date_published if oldest is None else min(oldest, date_published)
+
+            if not (date_published and is_newer(date_published, self.last_published_date) and 'remote' in workplace_type):
+                self.skipped(title, date_published, workplace_type)
+                continue
+
+            description = processed_data.get('requirements_summary', '')
+            cleaned_description = cleandescription(description, max_chars=DESCRIPTION_PREVIEW)
+            experience = processed_data.get('seniority_level') or None
+            languages = processed_data.get("language_requirements", [])
+            language_str = ", ".join(languages) if languages else None
+
+            location = processed_data.get('workplace_countries', [])
+            location_name = location[0] if location else None
+
+            hashtags = [
+                tag for tag in (
+                    normalize_tag(location_name),
+                    normalize_tag(experience.lower() if experience else ''),
+                    normalize_tag(language_str.lower() if language_str else '')
+                ) if tag
+            ]
+
+            salaryrange = processed_data.get('listed_compensation_frequency') or ''
+            if salaryrange:
+                salarymin = processed_data.get(f'{salaryrange.lower()}_min_compensation')
+                salarymax = processed_data.get(f'{salaryrange.lower()}_max_compensation')
+            else:
+                salarymin = salarymax = None
+
+            vacancy = Vacancy(
+                source=self.state_key,
+                id=str(item.get('id') or item.get('objectID') or link),
+                title=title,
+                url=link,
+                published_at=date_published,
+                company=processed_data.get('company_name') or None,
+                location=location_name,
+                salary_min=parse_amount(salarymin),
+                salary_max=parse_amount(salarymax),
+                salary_currency=processed_data.get('listed_compensation_currency') or None,
+                salary_period=salaryrange or None,
+                experience=experience,
+                language=language_str,
+                tags=tuple(hashtags),
+                description=preview(cleaned_description)
+            )
+            vacancies.append(vacancy)
+            new_last_published_date = update_last_published_date(new_last_published_date, date_published)
+            self.added(title, link)
+
+        return new_last_published_date, oldest
+
+    async def stream(self) -> AsyncIterator[Vacancy]:
+        count = 0
         new_last_published_date = self.last_published_date
 
         if not self.api_url:
             logger.error("HC_API_URL не указан в .env")
-            return []
+            return
 
+        size = self.page_size()
         payload = {
-            "size": 20,
+            "size": size,
             "page": 0,
             "searchState": {
                 "searchQuery": self.keywords,
@@ -52,159 +182,45 @@ class HiringCafeParser(VacancyParser):
             }
         }
 
-        async with aiohttp.ClientSession() as session:
+        async with self.http_session() as session:
             page = 0
-            while True:
-                payload["page"] = page
-                logger.info(f"Запрос к API Hiring Cafe: {self.api_url}, страница {page}, payload={payload}")
-                try:
-                    async with session.post(self.api_url, json=payload, ssl=False, timeout=10) as response:
-                        content = await response.text()
-                        if response.status == 401:
-                            logger.error("Ошибка авторизации (401): Возможно, требуется токен API Hiring Cafe.")
-                            return []
-                        response.raise_for_status()
-                        try:
-                            data = await response.json()
-                        except ValueError as e:
-                            logger.error(f"Ошибка декодирования JSON: {e}, содержимое: {content}")
-                            return []
-                except aiohttp.ClientResponseError as e:
-                    logger.error(f"HTTP-ошибка при запросе API {self.api_url}: {e.status}, {e.message}")
-                    return []
-                except aiohttp.ClientError as e:
-                    logger.error(f"Ошибка при запросе API {self.api_url}: {e}")
-                    if "SSL" in str(e):
-                        logger.warning("SSL-ошибка. Проверка SSL отключена. Рекомендуется обновить сертификаты.")
-                    return []
-
-                if not isinstance(data, dict) or 'results' not in data:
-                    logger.error(f"Неожиданный формат данных API: {type(data)}")
-                    return []
-                results = data.get('results', [])
-
-                if not results:
-                    logger.info(f"Нет вакансий на странице {page}")
-                    break
-
-                all_old = True  # Флаг: все вакансии на странице старые
-
-                for item in results:
-                    processed_data = item.get('v5_processed_job_data', {})
-                    title = processed_data.get('core_job_title', 'Без названия')
-                    link = item.get('apply_url', '#')
-                    workplace_type = processed_data.get('workplace_type', '').lower()
-                    date_published_str = processed_data.get('estimated_publish_date', '')
-
-                    # Парсинг даты
-                    date_published = None
-                    formatted_date = "Not specified"
-                    if date_published_str:
-                        try:
-                            parsed_date = parse(date_published_str, settings={'TIMEZONE': 'UTC', 'TO_TIMEZONE': 'UTC'})
-                            if parsed_date:
-                                date_published = to_utc(parsed_date)
-                                formatted_date = date_published.strftime('%d %B %Y')
-                            else:
-                                logger.warning(f"Не удалось разобрать дату: {date_published_str}")
-                        except Exception as e:
-                            logger.warning(f"Ошибка при обработке даты: {date_published_str}, {e}")
-
-                    description = processed_data.get('requirements_summary', '')
-                    cleaned_description = cleandescription(description)
-                    company = processed_data.get('company_name', 'Not specified')
-                    salaryrange = processed_data.get('listed_compensation_frequency', 'Не указано')
-                    experience = processed_data.get('seniority_level', 'Not specified')
-                    currency = processed_data.get('listed_compensation_currency', 'not specified')
-                    languages = processed_data.get("language_requirements", [])
-                    language_str = ", ".join(languages) if languages else "Not specified"
-
-                    location = processed_data.get('workplace_countries', [])
-                    location_name = location[0] if location else "Not specified"
-                    location_tag = normalize_tag(location_name)
-                    flag = get_flag_emoji(location_name)
-
-                    experience_tag = normalize_tag(experience.lower())
-                    language_tag = normalize_tag(language_str.lower())
-
-                    hashtags = []
-                    if location_name.lower() != "not specified" and location_tag:
-                        hashtags.append(location_tag)
-                    if experience_tag:
-                        hashtags.append(experience_tag)
-                    if language_tag:
-                        hashtags.append(language_tag)
-
-                    if salaryrange:
-                        salarymin = processed_data.get(f'{salaryrange.lower()}_min_compensation') or ''
-                        salarymax = processed_data.get(f'{salaryrange.lower()}_max_compensation') or ''
-                        if salarymin and salarymax:
-                            salary = f'{salarymin} {currency} - {salarymax} {currency} {salaryrange}'
-                        elif salarymin:
-                            salary = f'from {salarymin} {currency} {salaryrange}'
-                        elif salarymax:
-                            salary = f'to {salarymax} {currency} {salaryrange}'
-                        else:
-                            salary = 'Not specified'
-                    else:
-                        salary = 'Not specified'
-
-                    metadata = {
-                        "description": cleaned_description[:100] + "..." if len(cleaned_description) > 100 else cleaned_description,
-                        "experience": experience,
-                        "company": company,
-                        "published_date": date_published.strftime('%Y-%m-%d %H:%M:%S') if date_published else "Not specified",
-                        "published_date_str": formatted_date,
-                        "salary": salary,
-                        "language": language_str,
-                        "location": location_name,
-                        "flag": flag or "",
-                        "hashtags": hashtags
-                    }
-
-                    if date_published and is_newer(date_published, self.last_published_date) and 'remote' in workplace_type:
-                        all_old = False
-                        vacancies.append((title, link, metadata))
-                        new_last_published_date = update_last_published_date(new_last_published_date, date_published)
-                        logger.info(f"Добавлена вакансия: {title}, {link}")
-                    else:
-                        logger.debug(f"Пропущена вакансия: {title} (дата: {date_published}, тип: {workplace_type})")
-
-                if all_old:
-                    logger.info(f"Все вакансии на странице {page} старые, дальнейший парсинг остановлен.")
-                    break
-
-                page += 1
-
-        now = datetime.utcnow()
-        self.last_published_date = now
-        save_last_published_date(now, self.last_published_file)
-
-        logger.info(f"Итоговое количество новых вакансий: {len(vacancies)}")
-        return vacancies
-
-    def format_message(self, title: str, link: str, metadata: Dict) -> str:
-        hashtags = metadata.get("hashtags", [])
-        hashtags_str = " ".join(escape_html(tag) for tag in hashtags if tag)
-
-        title_html = escape_html(title)
-        description_html = escape_html(metadata.get("description", ""))
-        company_html = escape_html(metadata.get("company", "Not specified"))
-        location_html = escape_html(metadata.get("location", "Not specified"))
-        flag = metadata.get("flag", "")
-        experience_html = escape_html(metadata.get("experience", "Not specified"))
-        salary_html = escape_html(metadata.get("salary", "Not specified"))
-        language_html = escape_html(metadata.get("language", "Not specified"))
-
-        return (
-            f"💼 <b>{title_html}</b>\n"
-            f"📍 Location: {flag} {location_html}\n\n"
-            f"📅 Published: {metadata.get('published_date_str', 'Not specified')}\n\n"
-            f"⌛️ Experience: {experience_html}\n\n"
-            f"🏢 Company: {company_html}\n"
-            f"📝 Description:\n{description_html}\n\n"
-            f"🔤 Language: {language_html}\n\n"
-            f"💵 Salary: {salary_html}\n\n"
-            f"👉 <a href=\"{link}\">APPLY NOW</a>\n\n"
-            f"{hashtags_str}"
-        )
+            pending = asyncio.create_task(self.fetch_page(session, payload, page))
+            try:
+                while pending is not None:
+                    results = await pending
+                    pending = None
+                    if results is None:
+                        # Следующие страницы старше уже полученных: без них дату не сдвигаем
+                        new_last_published_date = None
+                        break
+                    if not results:
+                        logger.info("Нет вакансий на странице %s", page)
+                        break
+
+                    # Полная страница — возможно, есть следующая: запрашиваем её,
+                    # пока обрабатывается текущая
+                    if len(results) >= size:
+                        pending = asyncio.create_task(self.fetch_page(session, payload, page + 1))
+
+                    page_vacancies = []
+                    new_last_published_date, oldest = self.handle_page(results, page_vacancies, new_last_published_date)
+                    for vacancy in page_vacancies:
+                        count += 1
+                        yield vacancy
+
+                    # Выдача отсортирована по дате: если самая ранняя вакансия страницы
+                    # не новее сохранённой даты, дальше только старые
+                    if oldest is None or not is_newer(oldest, self.last_published_date):
+                        logger.info("Достигнуты уже обработанные вакансии на странице %s, дальнейший парсинг остановлен.", page)
+                        break
+                    page += 1
+            finally:
+                if pending is not None:
+                    pending.cancel()
+
+        if new_last_published_date:
+            self.last_published_date = new_last_published_date
+            save_last_published_date(new_last_published_date, self.state_key)
+
+        self.skipped.summary("Hiring Cafe: пропущено вакансий: %d")
+        logger.info("Итоговое количество новых вакансий: %s", count)
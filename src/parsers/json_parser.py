@@ -1,156 +1,113 @@
 import aiohttp
 import logging
-import os
 from datetime import datetime
-from typing import List, Tuple, Optional, Dict
-from dateparser import parse
+from typing import AsyncIterator, Optional
 from src.utils.lastpublished import save_last_published_date
-from src.utils.dateutils import to_utc, is_newer, update_last_published_date
+from src.utils.dateutils import update_last_published_date
 from src.parsers.base_parser import VacancyParser
-from src.utils.cleandescription import cleandescription
-from src.utils.getflags import get_flag_emoji
-from src.utils.normalizetags import normalize_tags, normalize_tag
-from src.utils.escapehtml import escape_html
+from src.parsers.registry import register
+from src.parsers.vacancy import Vacancy, parse_amount, preview
+from src.utils.normalizetags import normalize_tag
+from constants import KEYWORDS_MIN_SCORE
+from src.utils.keywordmatcher import get_matcher
+from src.utils.jsonstream import fetch_json_array
+from src.utils.normalizepool import RawFields, normalize_stream
+from src.utils.logsetup import SampledLog
 
 
-# Настройка логирования
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(
-    level=getattr(logging, log_level, logging.INFO),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
 logger = logging.getLogger(__name__)
 
+@register("json")
 class JSONParser(VacancyParser):
     def __init__(
         self,
         url: str,
-        keywords: str,
         last_published_date: Optional[datetime],
-        last_published_file: str
+        state_key: str,
+        *,
+        keywords: str = "",
+        session: Optional[aiohttp.ClientSession] = None,
+        min_score: int = KEYWORDS_MIN_SCORE
     ):
-        super().__init__(last_published_date, last_published_file)
+        super().__init__(last_published_date, state_key, session)
         self.api_url = url
-        self.keywords = [kw.strip().lower() for kw in keywords.split(',')] if keywords else []
+        self.matcher = get_matcher(keywords, min_score)
+
+    @staticmethod
+    def raw_fields(item) -> Optional[RawFields]:
+        if not isinstance(item, dict):
+            return None
+        return RawFields(
+            date=item.get('date') or '',
+            description=item.get('description') or '',
+            tags=tuple(item.get('tags') or ())
+        )
 
-    async def fetch_vacancies(self) -> List[Tuple[str, str, Dict]]:
+    async def stream(self) -> AsyncIterator[Vacancy]:
         """
         Получает вакансии из JSON API и фильтрует их по ключевым словам и дате.
+        Ответ разбирается потоково, Vacancy создаётся только для прошедших фильтр вакансий.
         """
-        vacancies = []
         new_last_published_date = self.last_published_date
 
         if not self.api_url:
             logger.error("JSON_FEED не указан в .env")
-            return []
+            return
 
-        async with aiohttp.ClientSession() as session:
-            logger.info(f"Запрос к JSON API: {self.api_url}")
+        complete = True
+        # Каждая вакансия в лог не пишется: итог за запуск выводит конвейер
+        added = SampledLog(logger, "Добавлена вакансия: %s, %s")
+        async with self.http_session() as session:
+            logger.info("Запрос к JSON API: %s", self.api_url)
             try:
-                    async with session.get(self.api_url, ssl=False, timeout=10) as response:
-                        response.raise_for_status()
-                        data = await response.json()
+                items = fetch_json_array(session, self.api_url, self.state_key, self.validators, ssl=False, timeout=10)
+                # Дата, очистка HTML и теги разбираются пачками в пуле нормализации
+                async for item, normalized in normalize_stream(items, self.raw_fields, self.last_published_date):
+                    title = item.get('position', 'Без названия')
+                    raw_tags = item.get('tags', []) or []
+                    tags = [tag.lower() for tag in raw_tags if tag]
+                    if not self.matcher.matches(title=title, description=normalized.description, tags=tags):
+                        continue
+
+                    date_published = normalized.published_at
+                    link = item.get('apply_url', '#')
+                    location = (item.get("location") or "").strip()
+                    location_tag = normalize_tag(location)
+                    hashtags = [location_tag] if location_tag else []
+                    hashtags += normalized.tags[:5]  # только 5, нормализуем
+
+                    vacancy = Vacancy(
+                        source=self.state_key,
+                        id=str(item.get('id') or link),
+                        title=title,
+                        url=link,
+                        published_at=date_published,
+                        company=item.get('company') or None,
+                        location=location or None,
+                        salary_min=parse_amount(item.get('salary_min')),
+                        salary_max=parse_amount(item.get('salary_max')),
+                        salary_currency="USD",
+                        tags=tuple(hashtags),
+                        description=preview(normalized.description)
+                    )
+                    yield vacancy
+                    new_last_published_date = update_last_published_date(new_last_published_date, date_published)
+                    added(title, link)
+                # Все элементы ленты обработаны: следующий запрос может получить 304
+                self.store_validators(self.api_url)
             except aiohttp.ClientResponseError as e:
-                    logger.error(f"HTTP-ошибка при запросе API {self.api_url}: {e.status}, {e.message}")
-                    return []
+                logger.error("HTTP-ошибка при запросе API %s: %s, %s", self.api_url, e.status, e.message)
+                complete = False
             except aiohttp.ClientError as e:
-                    logger.error(f"Ошибка при запросе API {self.api_url}: {e}")
-                    if "SSL" in str(e):
-                        logger.warning("SSL-ошибка. Проверка SSL отключена. Рекомендуется обновить сертификаты.")
-                    return []
+                logger.error("Ошибка при запросе API %s: %s", self.api_url, e)
+                if "SSL" in str(e):
+                    logger.warning("SSL-ошибка. Проверка SSL отключена. Рекомендуется обновить сертификаты.")
+                complete = False
             except ValueError as e:
-                    logger.error(f"Ошибка декодирования JSON от {self.api_url}: {e}")
-                    return []
-
-            if not isinstance(data, list):
-                logger.error(f"Неожиданный формат данных API: {type(data)}")
-                return []
-
-            for item in data:
-                title = item.get('position', 'Без названия')
-                link = item.get('apply_url', '#')
-                raw_description = item.get('description', '')
-                pub_date_str = item.get('date', '')
-                tags = [tag.lower() for tag in item.get('tags', []) if tag]
-                company = item.get('company', 'None')
-                salarymin = item.get('salary_min','None')
-                salarymax = item.get ('salary_max','None')
-                raw_tags = item.get('tags', []) or []
-                normalized_tags = normalize_tags(raw_tags)[:5]  # только 5, нормализуем
-                location = item.get("location", "").strip()
-                flag = get_flag_emoji(location)
-                location_tag = normalize_tag(location)
-
-                hashtags = [location_tag] if location_tag else []
-                hashtags += normalized_tags
-
-                # Очистка HTML из описания
-                description = cleandescription(raw_description)
-                salary = f"{str(salarymin)}$ - {str(salarymax)}$" if salarymin != '' or salarymax != '' else 'Not specified'
-
-
-                # Парсинг даты
-                date_published = None
-                formatted_date = "Not specified"  # ← Значение по умолчанию
-
-                if pub_date_str:
-                    try:
-                        parsed_date = parse(pub_date_str, settings={'TIMEZONE': 'UTC', 'TO_TIMEZONE': 'UTC'})
-                        if parsed_date:
-                            date_published = to_utc(parsed_date)
-                            formatted_date = date_published.strftime('%d %B %Y')
-                        else:
-                            logger.warning(f"Не удалось разобрать дату: {pub_date_str}")
-                    except Exception as e:
-                        logger.warning(f"Ошибка при обработке даты: {pub_date_str}, {e}")
-                
-                metadata = {
-                    "description": description[:100] + "..." if len(description) > 100 else description,
-                    "company": company,
-                    "published_date": date_published.strftime('%Y-%m-%d %H:%M:%S') if date_published else "Not specified",
-                    "published_date_str": formatted_date,
-                    "salary": salary,
-                    "hashtags": hashtags,     # ← для Telegram
-                    "location": location or "Not specified",
-                    "flag": flag or ''
-                }
+                logger.error("Ошибка декодирования JSON от %s: %s", self.api_url, e)
+                complete = False
 
-                # Фильтрация
-                content = f"{title.lower()} {description.lower()} {' '.join(tags)}".strip()
-                logger.debug(f"Ключевые слова: {self.keywords}, Содержимое: {content}")
-                if date_published and is_newer(date_published, self.last_published_date) and \
-                   (not self.keywords or any(keyword in content for keyword in self.keywords)):
-                    vacancies.append((title, link, metadata))
-                    new_last_published_date = update_last_published_date(new_last_published_date, date_published)
-                    logger.info(f"Добавлена вакансия: {title}, {link}")
-
-        if new_last_published_date:
+        # Лента прочитана не полностью: уже отобранные вакансии отдаём, но отметку не двигаем
+        if complete and new_last_published_date:
             self.last_published_date = new_last_published_date
-            save_last_published_date(new_last_published_date, self.last_published_file)
-
-        return vacancies
-
-    from src.utils.escapehtml import escape_html
-
-    def format_message(self, title: str, link: str, metadata: Dict) -> str:
-        hashtags = metadata.get("hashtags", [])
-        hashtags_str = " ".join(escape_html(tag) for tag in hashtags if tag)
-
-        title = escape_html(title)
-        description = escape_html(metadata["description"])
-        company = escape_html(metadata.get("company", "Not specified"))
-        salary = escape_html(metadata.get("salary", "Not specified"))
-        location = escape_html(metadata.get("location", "Not specified"))
-        flag = metadata.get("flag", "")
-
-        return (
-            f"📡 <b>{title}</b>\n"
-            f"📍 Location: {flag} {location}\n\n"
-            f"📅 Published: {metadata['published_date_str']}\n\n"
-            f"🏢 Company: {company}\n"
-            f"📝 Description: {description}\n\n"
-            f"💵 Estimated salary: {salary}\n\n"
-            f"👉 <a href=\"{link}\">APPLY NOW</a>\n\n"
-            f"{hashtags_str}"
-        )
+            save_last_published_date(new_last_published_date, self.state_key)
@@ -1,59 +1,58 @@
 import aiohttp
+import asyncio
+import json
 import logging
-import os
 from datetime import datetime, timedelta
-from typing import List, Tuple, Optional, Dict
-from dateparser import parse
+from typing import AsyncIterator, Optional
 from src.utils.lastpublished import save_last_published_date, load_last_published_date
-from src.utils.dateutils import to_utc, is_newer, update_last_published_date
+from src.utils.dateutils import to_utc, is_newer, update_last_published_date, parse_date
 from src.parsers.base_parser import VacancyParser
+from src.parsers.registry import register
+from src.parsers.vacancy import Vacancy, preview
 from src.utils.cleandescription import cleandescription
+from constants import DESCRIPTION_PREVIEW
 from src.utils.normalizetags import normalize_tag
-from src.utils.escapehtml import escape_html
-from src.utils.normalizetags import normalize_tags
-from src.utils.getflags import get_flag_emoji
+from src.utils.metrics import span
+from src.utils.httpretry import request
+from src.utils.logsetup import SampledLog
 
 
-
-
-# Настройка логирования
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(
-    level=getattr(logging, log_level, logging.INFO),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
 logger = logging.getLogger(__name__)
 
+@register("rapid")
 class RapidParser(VacancyParser):
     def __init__(
         self,
         url: str,
         last_published_date: Optional[datetime],
-        last_published_file: str,
+        state_key: str,
+        *,
+        keywords: str = "",
+        session: Optional[aiohttp.ClientSession] = None,
         host: str = "",
         key: str = ""
     ):
-        super().__init__(last_published_date, last_published_file)
+        super().__init__(last_published_date, state_key, session)
         self.api_url = url
         self.host = host
         self.key = key
+        self.keywords = keywords or "frontend"
 
-    async def fetch_vacancies(self) -> List[Tuple[str, str, Dict]]:
+    async def stream(self) -> AsyncIterator[Vacancy]:
         """
         Получает вакансии из API Rapid с фильтрацией по дате.
         """
-        vacancies = []
+        count = 0
         new_last_published_date = self.last_published_date
 
         if not self.api_url:
             logger.error("RAPID_API_URL не указан")
-            return []
+            return
 
         # Рассчитываем дату за вчера
         yesterday = datetime.now() - timedelta(days=1)
-        logger.info(f"Дата начала поиска: {yesterday}")
-        logger.debug(f"Последняя сохранённая дата: {self.last_published_date}")
+        logger.info("Дата начала поиска: %s", yesterday)
+        logger.debug("Последняя сохранённая дата: %s", self.last_published_date)
 
         headers = {}
         if self.host and self.key:
@@ -63,129 +62,96 @@ class RapidParser(VacancyParser):
             }
 
         querystring = {
-            "query": "frontend",
+            "query": self.keywords,
             "location": "any",
             "remoteOnly": "true",
             "employmentTypes": "fulltime;parttime;intern;contractor",
             "datePosted": "today"
         }
 
-        async with aiohttp.ClientSession() as session:
-            logger.info(f"Запрос к API Rapid: {self.api_url}, params={querystring}")
+        async with self.http_session() as session:
+            logger.info("Запрос к API Rapid: %s, params=%s", self.api_url, querystring)
             try:
-                async with session.request('GET', self.api_url, headers=headers, params=querystring, ssl=False, timeout=10) as response:
-                    content = await response.text()
-                    logger.debug(f"Содержимое ответа API: {content}")
-                    if response.status == 401:
-                        logger.error("Ошибка авторизации (401): Возможно, требуется валидный ключ API Rapid.")
-                        return []
-                    response.raise_for_status()
-                    try:
-                        data = await response.json()
-                    except ValueError as e:
-                        logger.error(f"Ошибка декодирования JSON: {e}, содержимое: {content}")
-                        return []
-                    logger.debug(f"Ответ API: {data}")
+                with span("fetch"):
+                    async with request(session, 'GET', self.api_url, self.state_key, headers=headers, params=querystring, ssl=False, timeout=10) as response:
+                        content = await response.text()
+                        logger.debug("Ответ API: %s, %s символов", response.status, len(content))
+                        if response.status == 401:
+                            logger.error("Ошибка авторизации (401): Возможно, требуется валидный ключ API Rapid.")
+                            return
+                        response.raise_for_status()
+                try:
+                    with span("decode"):
+                        data = json.loads(content)
+                except ValueError as e:
+                    logger.error("Ошибка декодирования JSON: %s, начало ответа: %.200s", e, content)
+                    return
             except aiohttp.ClientResponseError as e:
-                logger.error(f"HTTP-ошибка при запросе API {self.api_url}: {e.status}, {e.message}")
-                return []
-            except aiohttp.ClientError as e:
-                logger.error(f"Ошибка при запросе API {self.api_url}: {e}")
+                logger.error("HTTP-ошибка при запросе API %s: %s, %s", self.api_url, e.status, e.message)
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error("Ошибка при запросе API %s: %s", self.api_url, e)
                 if "SSL" in str(e):
                     logger.warning("SSL-ошибка. Проверка SSL отключена. Рекомендуется обновить сертификаты.")
-                return []
+                return
 
             # Проверка структуры ответа
             if not isinstance(data, dict) or 'jobs' not in data:
-                logger.error(f"Неожиданный формат данных API: {type(data)}")
-                return []
+                logger.error("Неожиданный формат данных API: %s", type(data))
+                return
             results = data.get('jobs', [])
-            logger.debug(f"Получено {len(results)} вакансий")
+            logger.debug("Получено %s вакансий", len(results))
 
+            # Сообщения по отдельным вакансиям пишутся выборочно, итог — одной строкой
+            added = SampledLog(logger, "Добавлена вакансия: %s, %s")
+            skipped = SampledLog(logger, "Вакансия '%s' не прошла фильтрацию: date_published=%s, last_published_date=%s")
             for item in results:
                 title = item.get('title', 'Without title')
-                logger.info(f"Обработка вакансии: {title}")
                 providers = item.get('jobProviders', [])
                 date_posted_str = item.get('datePosted', '')
-                logger.info(f"date_posted_str: {date_posted_str}")
 
                 # Парсинг даты
                 date_published = None
                 if date_posted_str:
                     try:
-                        parsed_date = parse(date_posted_str, settings={'TIMEZONE': 'UTC', 'TO_TIMEZONE': 'UTC'})
-                        logger.info(f"Дата публикации вакансии: {parsed_date}")
+                        parsed_date = parse_date(date_posted_str)
                         if parsed_date:
                             date_published = to_utc(parsed_date)
-                            formatted_date = date_published.strftime('%d %B %Y')
-                            logger.info(f"Дата публикации вакансии (UTC): {date_published}")
                     except Exception as e:
-                        logger.warning(f"Ошибка при обработке даты: {date_posted_str}, {e}")
-
-                # Метаданные (для совместимости с другими парсерами)
-                description = item.get('description', '')
-                cleaned_description = cleandescription(description)
-                company = item.get('company', 'Not specified')
-                salaryrange = item.get('salaryRange', 'Not specified')
-                location = item.get('location', 'Not specified')
-                flag = get_flag_emoji(location)
-                location_tag = normalize_tag(location)
-                hashtags = []
-                if location.lower() != "not specified" and location_tag:
-                    hashtags.append(location_tag)
-
-                if salaryrange:
-                    salary = salaryrange
-                else:
-                    salary = f'Not specified'
-
-                metadata = {
-                    "description": cleaned_description[:100] + "..." if len(cleaned_description) > 100 else cleaned_description,
-                    "company": company,
-                    "published_date": date_published.strftime('%Y-%m-%d %H:%M:%S') if date_published else "Not specified",
-                    "published_date_str": formatted_date,
-                    "salary": salary,
-                    "location": location,
-                    "flag": flag or "",
-                    "hashtags": hashtags
-                }
+                        logger.warning("Ошибка при обработке даты: %s, %s", date_posted_str, e)
 
                 # Фильтрация по дате
-                if date_published and is_newer(date_published, self.last_published_date):
-                    link = providers[0].get('url', '#') if providers else 'No link'
-                    vacancies.append((title, link, metadata))
-                    logger.info(f"Добавлена вакансия: {title}, {link}")
-                    new_last_published_date = update_last_published_date(new_last_published_date, date_published)
-                else:
-                    logger.debug(f"Вакансия '{title}' не прошла фильтрацию: date_published={date_published}, last_published_date={self.last_published_date}")
+                if not (date_published and is_newer(date_published, self.last_published_date)):
+                    skipped(title, date_published, self.last_published_date)
+                    continue
+
+                cleaned_description = cleandescription(item.get('description', ''), max_chars=DESCRIPTION_PREVIEW)
+                location = (item.get('location') or '').strip()
+                if location.lower() == "not specified":
+                    location = ''
+                location_tag = normalize_tag(location)
+                link = providers[0].get('url', '#') if providers else 'No link'
+
+                vacancy = Vacancy(
+                    source=self.state_key,
+                    id=str(item.get('id') or link),
+                    title=title,
+                    url=link,
+                    published_at=date_published,
+                    company=item.get('company') or None,
+                    location=location or None,
+                    salary_text=item.get('salaryRange') or None,
+                    tags=(location_tag,) if location_tag else (),
+                    description=preview(cleaned_description)
+                )
+                count += 1
+                yield vacancy
+                added(title, link)
+                new_last_published_date = update_last_published_date(new_last_published_date, date_published)
+            skipped.summary("Rapid: не прошли фильтр по дате: %d")
 
         if new_last_published_date:
             self.last_published_date = new_last_published_date
-            save_last_published_date(new_last_published_date, self.last_published_file)
-
-        logger.info(f"Итоговое количество вакансий: {len(vacancies)}")
-        return vacancies
-
-    def format_message(self, title: str, link: str, metadata: Dict) -> str:
-        hashtags = metadata.get("hashtags", [])
-        hashtags_str = " ".join(escape_html(tag) for tag in hashtags if tag)
-
-        title_escaped = escape_html(title)
-        description = escape_html(metadata.get("description", ""))
-        company = escape_html(metadata.get("company", "Not specified"))
-        raw_location = metadata.get("location", "").strip()
-        location = escape_html(raw_location) if raw_location else "Not specified"
-        flag = metadata.get("flag", "")
-        salary = escape_html(metadata.get("salary", "Not specified"))
-        published_date_str = escape_html(metadata.get("published_date_str", "Not specified"))
-
-        return (
-            f"💼 <b>{title_escaped}</b>\n"
-            f"📍 Location: {flag} {location}\n\n"
-            f"📅 Published: {published_date_str}\n\n"
-            f"🏢 Company: {company}\n"
-            f"📝 Description: {description}\n\n"
-            f"💵 Salary: {salary}\n\n"
-            f"👉 <a href=\"{link}\">APPLY NOW</a>\n\n"
-            f"{hashtags_str}"
-        )
\ No newline at end of file
+            save_last_published_date(new_last_published_date, self.state_key)
+
+        logger.info("Итоговое количество вакансий: %s", count)
@@ -0,0 +1,68 @@
+import aiohttp
+import importlib
+from datetime import datetime
+from typing import Callable, Dict, Optional, Type
+from src.parsers.base_parser import VacancyParser
+from src.utils.sources import SourceConfig
+
+# Встроенные парсеры по типу: модуль импортируется только при первом обращении
+PARSERS: Dict[str, str] = {
+    "rss": "src.parsers.rss_parser:RSSParser",
+    "json": "src.parsers.json_parser:JSONParser",
+    "nomads": "src.parsers.workingnomads:WorkingNomadsParser",
+    "hh": "src.parsers.hhparser:HHParser",
+    "hiringcafe": "src.parsers.hiringcafeparser:HiringCafeParser",
+    "rapid": "src.parsers.rapidparser:RapidParser",
+}
+
+# Классы, зарегистрированные декоратором register при импорте своего модуля
+_REGISTRY: Dict[str, Type[VacancyParser]] = {}
+
+
+def register(name: str) -> Callable[[Type[VacancyParser]], Type[VacancyParser]]:
+    """
+    Декоратор: регистрирует класс парсера под типом name.
+    Тип используется в поле "type" описания источника.
+    """
+    def decorator(cls: Type[VacancyParser]) -> Type[VacancyParser]:
+        registered = _REGISTRY.get(name)
+        if registered is not None and registered is not cls:
+            raise ValueError(f"Тип парсера {name} уже занят классом {registered.__name__}")
+        _REGISTRY[name] = cls
+        cls.parser_type = name
+        return cls
+    return decorator
+
+
+def get_parser_class(name: str) -> Type[VacancyParser]:
+    """
+    Возвращает класс парсера по типу, импортируя его модуль при необходимости.
+    :param name: Тип из PARSERS, зарегистрированный тип или путь "module:Class"
+                 для парсера вне пакета.
+    """
+    if name in _REGISTRY:
+        return _REGISTRY[name]
+    path = PARSERS.get(name) or (name if ":" in name else None)
+    if path is None:
+        raise ValueError(f"Неизвестный парсер: {name}")
+    module_name, class_name = path.split(":")
+    module = importlib.import_module(module_name)
+    cls = _REGISTRY.get(name) or getattr(module, class_name, None)
+    if not (isinstance(cls, type) and issubclass(cls, VacancyParser)):
+        raise ValueError(f"{path} не является парсером вакансий")
+    return cls
+
+
+def create_parser(
+    source: SourceConfig,
+    last_published_date: Optional[datetime],
+    session: Optional[aiohttp.ClientSession] = None
+) -> VacancyParser:
+    """
+    Создаёт экземпляр парсера для источника из конфигурации.
+    :raises ValueError: Если тип парсера неизвестен.
+    """
+    parser = get_parser_class(source.type).from_config(source, last_published_date, session)
+    if source.concurrency is not None:
+        parser.concurrency = source.concurrency
+    return parser
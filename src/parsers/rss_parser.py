@@ -1,78 +1,128 @@
-import feedparser
+import aiohttp
+import asyncio
 import logging
-import subprocess
 from datetime import datetime
-from typing import List, Tuple, Optional, Dict
+from typing import AsyncIterator, List, Optional, Union
 from urllib.parse import urlparse
-from src.utils.getflags import get_flag_emoji
 from src.utils.lastpublished import save_last_published_date
 from src.utils.dateutils import to_utc, is_newer, update_last_published_date
 from src.parsers.base_parser import VacancyParser
+from src.parsers.registry import register
+from src.parsers.vacancy import Vacancy, preview
 from src.utils.cleandescription import cleandescription
 from src.utils.normalizetags import normalize_tag
-from src.utils.escapehtml import escape_html
+from constants import KEYWORDS_MIN_SCORE
+from src.utils.keywordmatcher import get_matcher
+from src.utils.httpcache import get_http_cache
 from src.utils.normalizetags import normalize_tags
+from src.utils.metrics import span
+from src.utils.httpretry import request
+from src.utils.logsetup import SampledLog
 
 logger = logging.getLogger(__name__)
 
+@register("rss")
 class RSSParser(VacancyParser):
     def __init__(
         self,
-        rss_feeds: str,
-        keywords: str,
+        url: Union[str, List[str]],
         last_published_date: Optional[datetime],
-        last_published_file: str
+        state_key: str,
+        *,
+        keywords: str = "",
+        session: Optional[aiohttp.ClientSession] = None,
+        min_score: int = KEYWORDS_MIN_SCORE
     ):
-        super().__init__(last_published_date, last_published_file)
-        self.rss_feeds = rss_feeds.split(',') if rss_feeds else []
-        self.keywords = [kw.strip().lower() for kw in keywords.split(',')] if keywords else []
-
-    def fetch_with_curl(self, url: str, referer: str) -> Optional[str]:
+        super().__init__(last_published_date, state_key, session)
+        # Ленты можно перечислить списком или строкой через запятую
+        feeds = url.split(",") if isinstance(url, str) else url or []
+        self.rss_feeds = [feed.strip() for feed in feeds if feed.strip()]
+        self.matcher = get_matcher(keywords, min_score)
+
+    async def fetch_feed(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """
+        Асинхронно загружает RSS-ленту с заголовками браузера.
+        Валидаторы ответа откладываются в self.validators до обработки ленты.
+        :return: Текст ленты, "" если лента не изменилась (304), None при ошибке.
+        """
+        cache = get_http_cache()
+        parsed_url = urlparse(url)
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+            "Accept": "application/rss+xml",
+            "Referer": f"{parsed_url.scheme}://{parsed_url.netloc}/",
+            **cache.headers(url)
+        }
+        logger.info("Запрос RSS-ленты: %s", url)
         try:
-            result = subprocess.run([
-                "curl", "-sL", url,
-                "-H", "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-                "-H", "Accept: application/rss+xml",
-                "-H", f"Referer: {referer}"
-            ], capture_output=True, text=True, timeout=10)
-
-            if result.returncode != 0:
-                logger.error(f"curl завершился с ошибкой: {result.stderr.strip()}")
-                return None
-
-            return result.stdout
-
-        except Exception as e:
-            logger.error(f"Ошибка при curl-запросе к {url}: {e}")
-            return None
-
-    async def fetch_vacancies(self) -> List[Tuple[str, str, Dict]]:
-        vacancies = []
+            with span("fetch"):
+                async with request(session, 'GET', url, self.state_key, headers=headers, timeout=10) as response:
+                    if response.status == 304:
+                        cache.not_modified(url, self.state_key)
+                        return ""
+                    response.raise_for_status()
+                    body = await response.read()
+                    self.validators[url] = (response.headers, len(body))
+                    return body.decode(response.get_encoding(), errors="replace")
+        except aiohttp.ClientResponseError as e:
+            logger.error("HTTP-ошибка при запросе RSS %s: %s, %s", url, e.status, e.message)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("Ошибка при запросе RSS %s: %s", url, e)
+        return None
+
+    async def stream(self) -> AsyncIterator[Vacancy]:
+        import feedparser
         new_last_published_date = self.last_published_date
 
-        for rss_url in self.rss_feeds:
-            logger.info(f"Запрос RSS-ленты через curl: {rss_url}")
+        # Все ленты загружаются параллельно через один пул соединений
+        # (не больше self.concurrency одновременно, если ограничение задано)
+        semaphore = asyncio.Semaphore(self.concurrency or len(self.rss_feeds) or 1)
+
+        async def fetch_limited(session: aiohttp.ClientSession, url: str) -> Optional[str]:
+            async with semaphore:
+                return await self.fetch_feed(session, url)
 
-            parsed_url = urlparse(rss_url)
-            referer = f"{parsed_url.scheme}://{parsed_url.netloc}/"
+        async with self.http_session() as session:
+            contents = await asyncio.gather(
+                *(fetch_limited(session, rss_url) for rss_url in self.rss_feeds)
+            )
 
-            feed_content = self.fetch_with_curl(rss_url, referer)
+        # Каждая вакансия в лог не пишется: итог за запуск выводит конвейер
+        added = SampledLog(logger, "Добавлена вакансия: %s, %s")
+        for rss_url, feed_content in zip(self.rss_feeds, contents):
+            if feed_content is None:
+                logger.error("Не удалось получить RSS: %s", rss_url)
+                continue
             if not feed_content:
-                logger.error(f"Не удалось получить RSS: {rss_url}")
                 continue
 
-            feed = feedparser.parse(feed_content)
+            # Разбор XML в отдельном потоке, чтобы не блокировать event loop
+            with span("decode"):
+                feed = await asyncio.to_thread(feedparser.parse, feed_content)
             if feed.bozo:
-                logger.error(f"Ошибка парсинга RSS {rss_url}: {feed.bozo_exception}")
+                logger.error("Ошибка парсинга RSS %s: %s", rss_url, feed.bozo_exception)
                 continue
 
-            logger.info(f"Успешно получена RSS-лента: {rss_url}")
+            logger.info("Успешно получена RSS-лента: %s", rss_url)
 
             for entry in feed.entries:
                 title = entry.get('title', 'Без названия')
                 link = entry.get('link', '#')
                 published_date = entry.get('published_parsed', None)
-                raw_description = entry.get('description', '')
+
+                date_published = None
+                if published_date:
+                    try:
+                        date_published = to_utc(datetime(*published_date[:6]))
+                    except Exception as e:
+                        logger.warning("Ошибка обработки даты для %s: %s", title, e)
+                if not date_published or not is_newer(date_published, self.last_published_date):
+                    continue
+
+                description = cleandescription(entry.get('description', ''))
+                if not self.matcher.matches(title=title, description=description):
+                    continue
+
                 location = None
                 for loc_key in ['pubPlace', 'region', 'location']:
                     if loc_key in entry:
@@ -80,17 +130,6 @@ class RSSParser(VacancyParser):
                         if location:
                             location = location.strip()
                             break
-                flag = get_flag_emoji(location)
-                description = cleandescription(raw_description)
-
-                date_published = None
-                formatted_date = "Not specified"
-                if published_date:
-                    try:
-                        date_published = to_utc(datetime(*published_date[:6]))
-                        formatted_date = date_published.strftime('%d %B %Y')
-                    except Exception as e:
-                        logger.warning(f"Ошибка обработки даты для {title}: {e}")
                 skills = []
                 if 'skills' in entry:
                     skill_raw = entry.get('skills')
@@ -99,51 +138,25 @@ class RSSParser(VacancyParser):
                     elif isinstance(skill_raw, list):
                         skills = [skill.strip() for skill in skill_raw if isinstance(skill, str)]
                 location_tag = normalize_tag(location)
-                skill_tags = normalize_tags(skills)
-                hashtags = [location_tag] + skill_tags
-
-                metadata = {
-                    "source": "RSS",
-                    "description": description[:100] + "..." if len(description) > 100 else description,
-                    "published_date": date_published.strftime('%Y-%m-%d %H:%M:%S') if date_published else "None",
-                    "published_date_str": formatted_date,
-                    "location": location or "Not specified",
-                    "flag": flag or '',
-                    "hashtags": hashtags or []
-                }
-
-                vacancy = (title, link, metadata)
-
-                content = f"{title.lower()} {description.lower()}".strip()
-                if date_published and is_newer(date_published, self.last_published_date) and \
-                   any(keyword in content for keyword in self.keywords):
-                    vacancies.append(vacancy)
-                    logger.info(f"Добавлена вакансия: {title}, {link}")
-                    new_last_published_date = update_last_published_date(new_last_published_date, date_published)
+                hashtags = ([location_tag] if location_tag else []) + normalize_tags(skills)
+
+                vacancy = Vacancy(
+                    source=self.state_key,
+                    id=entry.get('id') or link,
+                    title=title,
+                    url=link,
+                    published_at=date_published,
+                    location=location or None,
+                    tags=tuple(hashtags),
+                    description=preview(description)
+                )
+                yield vacancy
+                added(title, link)
+                new_last_published_date = update_last_published_date(new_last_published_date, date_published)
+
+            # Лента обработана целиком: следующий запрос может получить 304
+            self.store_validators(rss_url)
 
         if new_last_published_date:
             self.last_published_date = new_last_published_date
-            save_last_published_date(new_last_published_date, self.last_published_file)
-
-        return vacancies
-
-    def format_message(self, title: str, link: str, metadata: Dict) -> str:
-        hashtags = metadata.get("hashtags", [])
-        hashtags_str = " ".join(escape_html(tag or "") for tag in hashtags if tag)
-        title = escape_html(title or '')
-        desc_raw = metadata['description']
-        if len(desc_raw) > 100:
-            description = escape_html(desc_raw[:100].rstrip() + "…")
-        else:
-            description = escape_html(desc_raw or "")
-        location = escape_html(metadata['location'] or "")
-        flag = metadata.get("flag", "")
-        link = escape_html(link or "")
-        return (
-         f"📰 <b>{title}</b>\n"
-        f"📍 Location: {flag} {location}\n\n"
-        f"📅 Published: {metadata['published_date_str']}\n\n"
-        f"📝 Description: {description}\n\n"
-        f"👉<a href=\"{link}\">APPLY NOW</a>\n\n"
-        f"{hashtags_str}"
-    )
+            save_last_published_date(new_last_published_date, self.state_key)
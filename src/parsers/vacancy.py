@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from src.utils.getflags import get_flag_emoji
+
+NOT_SPECIFIED = "Not specified"
+# Заглушки, которые парсеры подставляют вместо отсутствующей ссылки
+PLACEHOLDER_LINKS = {"", "#", "no link", "none"}
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """
+    Приводит сумму зарплаты из ответа API к числу.
+    Пустые, нулевые и нечисловые значения дают None.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value or None
+    try:
+        return float(str(value).replace(" ", "").replace(",", "")) or None
+    except ValueError:
+        return None
+
+
+def format_amount(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:g}"
+
+
+def preview(text: str, limit: int = 100) -> str:
+    """Обрезает описание до превью для сообщения."""
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+@dataclass(frozen=True, slots=True)
+class Vacancy:
+    """
+    Вакансия в едином для всех источников виде.
+    Поля, которых нет у источника, остаются None; дата — настоящий datetime в UTC.
+    """
+    source: str
+    id: str
+    title: str
+    url: str
+    published_at: datetime
+    company: Optional[str] = None
+    location: Optional[str] = None
+    salary_min: Optional[float] = None
+    salary_max: Optional[float] = None
+    salary_currency: Optional[str] = None
+    salary_period: Optional[str] = None
+    # Зарплата строкой, если источник не отдаёт суммы отдельно
+    salary_text: Optional[str] = None
+    experience: Optional[str] = None
+    language: Optional[str] = None
+    # Нормализованные хештеги (#fr_...)
+    tags: Tuple[str, ...] = ()
+    description: str = ""
+
+    @property
+    def seen_key(self) -> str:
+        """
+        Ключ для фильтра уже опубликованных: ID из источника (парсеры подставляют
+        ссылку, если ID нет). Без ID и настоящей ссылки ключ строится из названия,
+        компании и даты: заглушка "#" совпала бы у всех таких вакансий.
+        """
+        if (self.id or "").strip().lower() not in PLACEHOLDER_LINKS:
+            return self.id
+        return f"{self.title}|{self.company or ''}|{self.published_at.isoformat()}"
+
+    @property
+    def published_date_str(self) -> str:
+        return self.published_at.strftime('%d %B %Y')
+
+    @property
+    def flag(self) -> str:
+        return get_flag_emoji(self.location)
+
+    @property
+    def salary(self) -> str:
+        """Зарплата для сообщения: вилка, «from»/«to» или исходная строка."""
+        suffix = " ".join(part for part in (self.salary_currency, self.salary_period) if part)
+        suffix = f" {suffix}" if suffix else ""
+        if self.salary_min and self.salary_max:
+            return f"{format_amount(self.salary_min)}–{format_amount(self.salary_max)}{suffix}"
+        if self.salary_min:
+            return f"from {format_amount(self.salary_min)}{suffix}"
+        if self.salary_max:
+            return f"to {format_amount(self.salary_max)}{suffix}"
+        return self.salary_text or NOT_SPECIFIED
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time as timer
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from src.bot import DigestQueue, PublishQueue
+from src.parsers.base_parser import VacancyParser
+from src.parsers.vacancy import Vacancy
+from src.utils.dedup import DedupIndex
+from src.utils.statestore import StateStore
+from src.utils.metrics import current_source, span, observe, VACANCIES, PARSER_RUNS
+from src.utils.logsetup import SampledLog
+from src.utils.httpretry import get_breaker, record_failure
+from constants import FETCH_CONCURRENCY, PARSER_TIMEOUT, PIPELINE_QUEUE_SIZE, DIGEST_GROUP_BY
+
+logger = logging.getLogger(__name__)
+
+# Маркер конца потока, передаётся от этапа к этапу
+STOP = object()
+
+Item = Tuple[VacancyParser, Vacancy]
+
+
+async def produce(parser: VacancyParser, outbox: asyncio.Queue, semaphore: asyncio.Semaphore) -> int:
+    """
+    Читает parser.stream() и передаёт вакансии первому этапу конвейера.
+    PARSER_TIMEOUT ограничивает только время работы самого парсера:
+    ожидание места в очереди (обратное давление от публикации) в него не входит.
+    Ошибка или таймаут одного парсера не влияет на остальные. Источник, отключённый
+    предохранителем после ошибок подряд, пропускается; таймаут считается его ошибкой.
+
+    :return: Число полученных вакансий.
+    """
+    breaker = get_breaker(parser.state_key)
+    if breaker.is_open:
+        PARSER_RUNS.inc(parser.state_key, "skipped")
+        logger.warning("Источник %s отключён после ошибок подряд, пропущен; пробный запуск через %.0f мин.", parser.state_key, breaker.retry_in() / 60)
+        return 0
+    count = 0
+    busy = 0.0
+    result = "ok"
+    # Метрики очистки, разбора дат и фильтрации внутри парсера относятся к этому источнику
+    current_source.set(parser.state_key)
+    async with semaphore:
+        stream = parser.stream().__aiter__()
+        try:
+            while True:
+                started = timer.monotonic()
+                try:
+                    vacancy = await asyncio.wait_for(stream.__anext__(), timeout=PARSER_TIMEOUT - busy)
+                except StopAsyncIteration:
+                    break
+                finally:
+                    busy += timer.monotonic() - started
+                count += 1
+                await outbox.put((parser, vacancy))
+        except asyncio.TimeoutError:
+            result = "timeout"
+            logger.error("Парсер %s не уложился в %s сек. и был остановлен", parser.state_key, PARSER_TIMEOUT)
+            record_failure(parser.state_key, "timeout")
+        except Exception as e:
+            result = "error"
+            logger.error("Ошибка при получении вакансий парсером %s: %s", parser.state_key, e)
+        finally:
+            await stream.aclose()
+
+    PARSER_RUNS.inc(parser.state_key, result)
+    VACANCIES.inc(parser.state_key, "fetched", amount=count)
+    observe("parser", busy, parser.state_key)
+    logger.info("Получено %s вакансий от %s за %.2f сек.", count, parser.state_key, busy)
+    return count
+
+
+async def run_stage(
+    name: str,
+    handler: Callable[[Any], Awaitable[Optional[Any]]],
+    inbox: asyncio.Queue,
+    outbox: Optional[asyncio.Queue] = None
+) -> None:
+    """
+    Этап конвейера: передаёт результат handler для каждого элемента inbox в outbox.
+    None от handler означает, что элемент отсеян. Ошибка на одном элементе
+    этап не останавливает. Получив STOP, передаёт его дальше и завершается.
+    """
+    passed = dropped = 0
+    while True:
+        item = await inbox.get()
+        if item is STOP:
+            break
+        try:
+            result = await handler(item)
+        except Exception as e:
+            logger.error("Ошибка на этапе %s: %s", name, e)
+            result = None
+        if result is None:
+            dropped += 1
+            continue
+        passed += 1
+        if outbox is not None:
+            await outbox.put(result)
+
+    if outbox is not None:
+        await outbox.put(STOP)
+    logger.info("Этап %s: передано %s, отсеяно %s", name, passed, dropped)
+
+
+def digest_group(vacancy: Vacancy) -> str:
+    """Группа вакансии для дайджеста: источник или первый тег."""
+    if DIGEST_GROUP_BY == "tag":
+        return vacancy.tags[0] if vacancy.tags else "#other"
+    return vacancy.source
+
+
+async def run_pipeline(
+    parsers: List[VacancyParser],
+    store: StateStore,
+    dedup: DedupIndex,
+    publisher: Union[PublishQueue, DigestQueue]
+) -> Dict[str, int]:
+    """
+    Конвейер от получения до публикации: парсеры → фильтр уже опубликованных →
+    дедупликация → форматирование → очередь отправки.
+    Этапы связаны ограниченными очередями: когда Telegram сдерживает отправку,
+    очереди заполняются и парсеры приостанавливаются, а первая вакансия
+    уходит, не дожидаясь самого медленного источника.
+    С DigestQueue вакансии публикуются дайджестами по группам (DIGEST_GROUP_BY).
+
+    :return: Число новых вакансий от каждого источника (по state_key) — прошедших
+        фильтр уже опубликованных и дедупликацию и поставленных в очередь отправки.
+        Полученные парсером, но отсеянные вакансии не учитываются.
+    """
+    seen_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    dedup_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    format_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    publish_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    # Отсеянные вакансии в лог пишутся выборочно: итоги выводят этапы и индекс дубликатов
+    seen_log = SampledLog(logger, "Вакансия уже публиковалась: %s, %s")
+    duplicate_log = SampledLog(logger, "Пропущен дубликат от %s: %s, %s")
+    new_counts = {parser.state_key: 0 for parser in parsers}
+
+    async def skip_seen(item: Item) -> Optional[Item]:
+        parser, vacancy = item
+        with span("seen", parser.state_key):
+            seen = store.is_seen(parser.state_key, vacancy.seen_key)
+        if seen:
+            VACANCIES.inc(parser.state_key, "seen")
+            seen_log(vacancy.title, vacancy.url)
+            return None
+        return item
+
+    async def skip_duplicates(item: Item) -> Optional[Item]:
+        parser, vacancy = item
+        with span("dedup", parser.state_key):
+            unique = dedup.check_and_reserve(parser.state_key, vacancy.url, vacancy.title, vacancy.company)
+        if not unique:
+            VACANCIES.inc(parser.state_key, "duplicate")
+            duplicate_log(parser.state_key, vacancy.title, vacancy.url)
+            return None
+        return item
+
+    async def format_vacancy(item: Item) -> Tuple[VacancyParser, Vacancy, str]:
+        parser, vacancy = item
+        with span("format", parser.state_key):
+            message = parser.format_message(vacancy)
+        return parser, vacancy, message
+
+    def on_sent(parser: VacancyParser, vacancy: Vacancy) -> None:
+        store.mark_seen(parser.state_key, vacancy.seen_key)
+        dedup.add(vacancy.url, vacancy.title, vacancy.company)
+        VACANCIES.inc(parser.state_key, "published")
+
+    async def publish(item: Tuple[VacancyParser, Vacancy, str]) -> Tuple[VacancyParser, Vacancy, str]:
+        parser, vacancy, message = item
+        # Ожидание места в очереди отправки — обратное давление от Telegram
+        with span("enqueue", parser.state_key):
+            await publisher.put(
+                message,
+                on_sent=partial(on_sent, parser, vacancy),
+                group=digest_group(vacancy)
+            )
+        VACANCIES.inc(parser.state_key, "queued")
+        new_counts[parser.state_key] = new_counts.get(parser.state_key, 0) + 1
+        return item
+
+    stages = [
+        asyncio.create_task(run_stage("seen", skip_seen, seen_queue, dedup_queue)),
+        asyncio.create_task(run_stage("dedup", skip_duplicates, dedup_queue, format_queue)),
+        asyncio.create_task(run_stage("format", format_vacancy, format_queue, publish_queue)),
+        asyncio.create_task(run_stage("publish", publish, publish_queue)),
+    ]
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+    started = timer.monotonic()
+    try:
+        results = await asyncio.gather(
+            *(produce(parser, seen_queue, semaphore) for parser in parsers),
+            return_exceptions=True
+        )
+        fetched = 0
+        for parser, result in zip(parsers, results):
+            if isinstance(result, BaseException):
+                logger.error("Ошибка при обработке парсера %s: %s", parser.state_key, result)
+                continue
+            fetched += result
+        logger.info("Этап получения завершён за %.2f сек., получено %s вакансий", timer.monotonic() - started, fetched)
+
+        await seen_queue.put(STOP)
+        await asyncio.gather(*stages)
+    finally:
+        for task in stages:
+            task.cancel()
+    return new_counts
@@ -1,101 +1,92 @@
 import asyncio
+import random
 from datetime import datetime, time, timedelta
-from src.parsers.hhparser import HHParser
-from src.parsers.rss_parser import RSSParser
-from src.parsers.workingnomads import WorkingNomadsParser
-from src.parsers.json_parser import JSONParser
-from src.parsers.hiringcafeparser import HiringCafeParser
-from src.parsers.rapidparser import RapidParser
-from src.bot import send_message, get_updates, send_selfpromo
+from typing import Dict, Iterable, List, Optional, Set
+import aiohttp
+from src.bot import DigestQueue, PublishQueue, get_updates, send_selfpromo
 from src.utils.lastpublished import load_last_published_date
-from constants import RSS_FEEDS, KEYWORDS, JSON_FEED, HH_URL, TIMEOUT, WORKINGNOMADS_URL,RAPIDHOST,RAPIDKEY,JOB_URL,HF_URL
+from src.utils.statestore import get_state_store
+from src.parsers.registry import create_parser
+from src.pipeline import run_pipeline
+from src.utils.httpclient import create_session
+from src.utils.dedup import DedupIndex
+from src.utils.httpcache import get_http_cache
+from src.utils.sources import SourceConfig, load_sources
+from src.utils.messagetemplate import load_templates
+from src.utils.normalizepool import shutdown_executors
+from src.control import start_control_server
+from constants import STATE_LOOKBACK_HOURS, SOURCES_FILE, CHECK_INTERVAL
+from constants import SCHEDULE_JITTER, SCHEDULE_TARGET_ITEMS, SELFPROMO_TIMES, DIGEST_MODE
 import logging
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
 logger = logging.getLogger(__name__)
 
-async def job():
-    logger.info(f"[{datetime.now()}] Запуск саморекламы...")
-    await send_selfpromo()
+DEFAULT_RUN_TIMES = ["10:00", "20:00"]
+# Во сколько раз растёт интервал опроса источника без новых вакансий
+SCHEDULE_BACKOFF = 1.5
+
+# Старые файлы с датами, переносятся в хранилище состояния при первом запуске
+LEGACY_FILES = {
+    "rapid": "last_published_rapid.json",
+    "hiringcafe": "last_published_HF.json",
+    "rss": "last_published_rss.json",
+    "json": "last_published_json.json",
+    "hh": "last_published_hh.json",
+    "nomads": "last_published_nomads.json",
+}
+
+async def job(session: Optional[aiohttp.ClientSession] = None, sources: Optional[List[SourceConfig]] = None) -> Dict[str, int]:
     """
     Асинхронная задача для получения и отправки вакансий.
     
-    :param config: Конфигурация из config.yaml.
+    :param session: Общая HTTP-сессия для всех парсеров.
+    :param sources: Источники для этого запуска; по умолчанию все включённые из SOURCES_FILE.
+    :return: Число новых вакансий по именам источников: только прошедших фильтр
+        уже опубликованных и дедупликацию (по ним подстраивается интервал опроса).
     """
-    logger.info(f"[{datetime.now()}] Начинается выполнение задачи...")
+    logger.info("[%s] Начинается выполнение задачи...", datetime.now())
     await get_updates()  # Получение обновлений от Telegram
-    RAPIDFILE ='last_published_rapid.json'
-    HF_FILE = 'last_published_HF.json'
-    RSS_FILE = 'last_published_rss.json'
-    JSON_FILE = 'last_published_json.json'
-    HH_FILE = 'last_published_hh.json'
-    NOMADS_FILE = 'last_published_nomads.json'
-    rapid_date = load_last_published_date(RAPIDFILE)
-    HF_date = load_last_published_date(HF_FILE)
-    rss_date = load_last_published_date(RSS_FILE)
-    json_date = load_last_published_date(JSON_FILE)
-    hh_date = load_last_published_date(HH_FILE)
-    nomads_date = load_last_published_date(NOMADS_FILE)
-
-    # Инициализация парсеров
-    parsers = [
-        RSSParser(
-            RSS_FEEDS,
-            KEYWORDS,
-            rss_date,
-            RSS_FILE
-        ),
-        JSONParser(
-            JSON_FEED,
-            KEYWORDS,
-            json_date,
-            JSON_FILE
-        ),
-    
-        WorkingNomadsParser(
-            WORKINGNOMADS_URL,
-            KEYWORDS,
-            nomads_date,
-            NOMADS_FILE
-        ),
-        HHParser(
-            HH_URL,
-            hh_date,
-            HH_FILE
-            
-        ),
-        HiringCafeParser(
-            HF_URL,
-            HF_date,
-            HF_FILE
-        ),
-        RapidParser(
-            JOB_URL,
-            rapid_date,
-            RAPIDFILE,
-            RAPIDHOST,
-            RAPIDKEY
-        )
-    ]
-
-    # Обработка вакансий от каждого парсера
-    for parser in parsers:
+    if sources is None:
+        sources = load_sources()
+    store = get_state_store()
+    store.import_legacy_files(LEGACY_FILES)
+    lookback = timedelta(hours=STATE_LOOKBACK_HOURS)
+
+    # Парсеры создаются только для включённых источников
+    parsers = []
+    for source in sources:
+        if not source.enabled:
+            continue
         try:
-            vacancies = await parser.fetch_vacancies()
-            logger.info(f"Получено {len(vacancies)} вакансий от {parser.__class__.__name__}")
-            for title, link, metadata in vacancies:
-                message = parser.format_message(title, link, metadata)
-                await send_message(message)
-                await asyncio.sleep(TIMEOUT)  # Задержка для избежания лимитов Telegram
+            parsers.append(create_parser(
+                source,
+                load_last_published_date(source.name, lookback),
+                session=session
+            ))
         except Exception as e:
-            logger.error(f"Ошибка при обработке парсера {parser.__class__.__name__}: {e}")
+            logger.error("Не удалось создать парсер для источника %s (%s): %s", source.name, source.type, e)
+
+    # Вакансии идут от парсеров к публикации потоком; дубликаты между источниками
+    # отсеиваются, темп отправки задаёт очередь по лимитам Telegram
+    dedup = DedupIndex()
+    publisher = PublishQueue()
+    if DIGEST_MODE:
+        publisher = DigestQueue(publisher)
+    publisher.start()
+    counts = {}
+    try:
+        counts = await run_pipeline(parsers, store, dedup, publisher)
+    finally:
+        await publisher.close()
+        store.commit()
+        dedup.save()
+        dedup.report()
+        http_cache = get_http_cache()
+        http_cache.save()
+        http_cache.report()
 
-    logger.info(f"[{datetime.now()}] Задача завершена.")
+    logger.info("[%s] Задача завершена.", datetime.now())
+    return counts
 
 async def wait_until(target_time: time, day: datetime.date = None):
     """
@@ -109,37 +100,198 @@ async def wait_until(target_time: time, day: datetime.date = None):
 
     delay = (target - now).total_seconds()
     if delay > 0:
-        logger.info(f"Ожидаю до {target.strftime('%Y-%m-%d %H:%M:%S')} ({int(delay)} сек.)")
+        logger.info("Ожидаю до %s (%s сек.)", target.strftime('%Y-%m-%d %H:%M:%S'), int(delay))
         await asyncio.sleep(delay)
 
-async def start_scheduler():
+def parse_times(values: Iterable[str]) -> List[time]:
+    return sorted(time.fromisoformat(value.strip()) for value in values if value.strip())
+
+def next_time(times: List[time], now: datetime) -> datetime:
     """
-    Планировщик: выполняет job в 14:10 и 20:00 каждый день.
+    Ближайший после now момент из ежедневного списка времени.
     """
-    while True:
+    for run_time in times:
+        candidate = datetime.combine(now.date(), run_time)
+        if candidate > now:
+            return candidate
+    # Если сегодня все запуски прошли — берём первый завтра
+    return datetime.combine(now.date() + timedelta(days=1), times[0])
+
+class SourceSchedule:
+    """
+    Расписание одного источника. schedule.times — запуски в фиксированное время;
+    schedule.interval_minutes — опрос с интервалом, который подстраивается под
+    число новых вакансий: чаще, пока источник активен, реже, когда он молчит.
+    """
+    def __init__(self, source: SourceConfig):
+        schedule = source.schedule
+        self.source = source
+        self.times = parse_times(schedule.get("times") or [])
+        interval = float(schedule.get("interval_minutes") or 0)
+        if not self.times and not interval:
+            self.times = parse_times(DEFAULT_RUN_TIMES)
+        self.interval = interval * 60
+        self.min_interval = float(schedule.get("min_interval_minutes") or interval / 4) * 60
+        self.max_interval = float(schedule.get("max_interval_minutes") or CHECK_INTERVAL) * 60
+        self.target = int(schedule.get("target_items") or SCHEDULE_TARGET_ITEMS)
+        self.jitter = float(schedule.get("jitter", SCHEDULE_JITTER))
+        self.next_run_at: Optional[datetime] = None
+        self.last_count: Optional[int] = None
+
+    @property
+    def adaptive(self) -> bool:
+        return not self.times
+
+    def plan(self, now: datetime) -> datetime:
+        """
+        Назначает следующий запуск. К интервалу добавляется случайный разброс ±jitter,
+        чтобы источники не опрашивались синхронно.
+        """
+        if self.adaptive:
+            delay = self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+            self.next_run_at = now + timedelta(seconds=delay)
+        else:
+            self.next_run_at = next_time(self.times, now)
+        return self.next_run_at
+
+    def adapt(self, new_items: int) -> None:
+        """
+        Подстраивает интервал по числу новых вакансий за опрос:
+        не меньше target — интервал вдвое короче, ни одной — в SCHEDULE_BACKOFF раз длиннее.
+        """
+        self.last_count = new_items
+        if not self.adaptive:
+            return
+        previous = self.interval
+        if new_items >= self.target:
+            self.interval = max(self.min_interval, self.interval / 2)
+        elif new_items == 0:
+            self.interval = min(self.max_interval, self.interval * SCHEDULE_BACKOFF)
+        if self.interval != previous:
+            logger.info("Источник %s: %s новых, интервал %.0f → %.0f мин.", self.source.name, new_items, previous / 60, self.interval / 60)
+
+    def status(self) -> Dict:
+        return {
+            "next_run": self.next_run_at.isoformat(timespec="seconds") if self.next_run_at else None,
+            "interval_minutes": round(self.interval / 60, 1) if self.adaptive else None,
+            "times": [run_time.strftime("%H:%M") for run_time in self.times],
+            "last_new_items": self.last_count,
+        }
+
+class Scheduler:
+    """
+    Запускает источники по их расписаниям. Источники, чьё время подошло одновременно,
+    обрабатываются одним job. trigger() запускает источник вне расписания.
+    """
+    def __init__(self, session: aiohttp.ClientSession, sources: List[SourceConfig]):
+        self.session = session
+        self.schedules = {source.name: SourceSchedule(source) for source in sources}
+        self.triggered: Set[str] = set()
+        self.wakeup = asyncio.Event()
+
+    def trigger(self, name: str) -> bool:
+        """
+        Ставит источник в очередь на внеочередной запуск.
+        :return: False, если такого включённого источника нет.
+        """
+        if name not in self.schedules:
+            return False
+        logger.info("Ручной запуск источника %s", name)
+        self.triggered.add(name)
+        self.wakeup.set()
+        return True
+
+    def status(self) -> Dict[str, Dict]:
+        return {name: schedule.status() for name, schedule in self.schedules.items()}
+
+    async def run(self) -> None:
+        """
+        Бесконечный цикл ожидания и запуска job.
+        """
         now = datetime.now()
+        for schedule in self.schedules.values():
+            schedule.plan(now)
 
-        # Определяем время сегодняшних запусков
-        run_times = [
-            datetime.combine(now.date(), time(10, 0)),
-            datetime.combine(now.date(), time(20, 0)),
-        ]
-
-        # Выбираем ближайшее время запуска из оставшихся сегодня
-        next_run = None
-        for run_time in run_times:
-            if run_time > now:
-                next_run = run_time
-                break
-        
-        # Если сегодня все запуски прошли — берём 14:10 завтра
-        if next_run is None:
-            next_run = datetime.combine(now.date() + timedelta(days=1), time(10, 0))
-
-        delay = (next_run - now).total_seconds()
-        logger.info(f"Ожидаю до следующего запуска job: {next_run.strftime('%Y-%m-%d %H:%M:%S')} ({int(delay)} сек.)")
-        await asyncio.sleep(delay)
+        while True:
+            now = datetime.now()
+            run_at = min(schedule.next_run_at for schedule in self.schedules.values())
+            delay = max(0.0, (run_at - now).total_seconds())
+            if not self.triggered:
+                waiting = [name for name, schedule in self.schedules.items() if schedule.next_run_at == run_at]
+                logger.info("Ожидаю до следующего запуска job: %s (%s сек.), источники: %s", run_at.strftime('%Y-%m-%d %H:%M:%S'), int(delay), ', '.join(waiting))
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            self.wakeup.clear()
 
-        logger.info(f"⏰ Запуск job в {next_run.strftime('%H:%M')}")
-        await job()
+            now = datetime.now()
+            due = [
+                schedule for name, schedule in self.schedules.items()
+                if schedule.next_run_at <= now or name in self.triggered
+            ]
+            self.triggered.clear()
+            if not due:
+                continue
 
+            logger.info("⏰ Запуск job в %s: %s", now.strftime('%H:%M'), ', '.join(schedule.source.name for schedule in due))
+            try:
+                counts = await job(self.session, [schedule.source for schedule in due])
+            except Exception as e:
+                logger.error("Ошибка при выполнении job: %s", e)
+                counts = {}
+            now = datetime.now()
+            for schedule in due:
+                schedule.adapt(counts.get(schedule.source.name, 0))
+                schedule.plan(now)
+
+async def run_selfpromo() -> None:
+    """
+    Отправляет саморекламу в SELFPROMO_TIMES независимо от расписаний источников.
+    """
+    times = parse_times(SELFPROMO_TIMES.split(","))
+    while True:
+        run_at = next_time(times, datetime.now())
+        await asyncio.sleep((run_at - datetime.now()).total_seconds())
+        logger.info("[%s] Запуск саморекламы...", datetime.now())
+        await send_selfpromo()
+
+async def start_scheduler():
+    """
+    Планировщик: запускает источники из SOURCES_FILE по их расписаниям
+    и поднимает локальный сервер управления для ручного запуска.
+    Владеет общей HTTP-сессией: соединения переиспользуются между запусками.
+    """
+    sources = [source for source in load_sources() if source.enabled]
+    if not sources:
+        logger.error("В %s нет включённых источников, планировщик не запущен", SOURCES_FILE)
+        return
+    # Ошибка в шаблонах сообщений обнаруживается при старте, а не на первой вакансии
+    load_templates()
+    async with create_session() as session:
+        scheduler = Scheduler(session, sources)
+        control = await start_control_server(scheduler)
+        selfpromo = asyncio.create_task(run_selfpromo())
+        try:
+            await scheduler.run()
+        finally:
+            selfpromo.cancel()
+            if control is not None:
+                await control.cleanup()
+            shutdown_executors()
+
+async def run_once(names: List[str]) -> None:
+    """
+    Разовый запуск указанных источников вне расписания (python main.py --run hh).
+    """
+    sources = [source for source in load_sources() if source.name in names]
+    missing = set(names) - {source.name for source in sources}
+    if missing:
+        logger.error("Источники не найдены в %s: %s", SOURCES_FILE, ', '.join(sorted(missing)))
+    if not sources:
+        return
+    try:
+        async with create_session() as session:
+            await job(session, sources)
+    finally:
+        shutdown_executors()
@@ -1,16 +1,104 @@
+from html.parser import HTMLParser
+from typing import List, Optional
+from constants import CLEAN_BACKEND
+from src.utils.metrics import span
 
+# Содержимое этих тегов не является видимым текстом
+SKIP_TAGS = {"script", "style", "template"}
 
-from bs4 import BeautifulSoup
 
+class _EnoughText(Exception):
+    """Набрано достаточно текста, дальше разбирать не нужно."""
 
-def cleandescription(html_text: str) -> str:
+
+class TextExtractor(HTMLParser):
+    """
+    Потоковый сборщик видимого текста на html.parser.
+    Дерево документа не строится; при заданном max_chars разбор
+    прерывается, как только текста набралось больше max_chars.
+    """
+    def __init__(self, max_chars: Optional[int] = None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.length = 0
+        self.skip_depth = 0
+        # Соседние куски текста без тега между ними — одна строка, как в BeautifulSoup
+        self.in_text = False
+
+    def handle_starttag(self, tag, attrs):
+        self.in_text = False
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self.in_text = False
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_comment(self, data):
+        self.in_text = False
+
+    def handle_decl(self, decl):
+        self.in_text = False
+
+    def handle_pi(self, data):
+        self.in_text = False
+
+    def unknown_decl(self, data):
+        self.in_text = False
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.in_text:
+            self.parts[-1] += data
+            self.length += len(data)
+        else:
+            self.parts.append(data)
+            self.length += len(data) + 1
+            self.in_text = True
+        if self.max_chars is not None and self.length > self.max_chars and len(self.text()) > self.max_chars:
+            raise _EnoughText()
+
+    def text(self) -> str:
+        return " ".join(self.parts).strip()
+
+
+def strip_html(html_text: str, max_chars: Optional[int] = None) -> str:
+    extractor = TextExtractor(max_chars)
+    try:
+        extractor.feed(html_text)
+        extractor.close()
+    except _EnoughText:
+        pass
+    return extractor.text()
+
+
+def strip_html_soup(html_text: str, parser: str = 'html.parser') -> str:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_text, parser)
+    return soup.get_text(separator=' ').strip()
+
+
+def cleandescription(html_text: str, max_chars: Optional[int] = None, backend: Optional[str] = None) -> str:
     """
     Удаляет HTML-теги и возвращает чистый текст.
+    :param html_text: Описание вакансии в HTML.
+    :param max_chars: Если задан, потоковый разбор останавливается, когда текста
+        набралось больше max_chars: начало строки совпадает с полным результатом,
+        а длина > max_chars сохраняется для проверки «нужно ли многоточие».
+    :param backend: "stream" (по умолчанию), "bs4" или "lxml"; по умолчанию CLEAN_BACKEND.
     """
     if not html_text:
         return ""
+    backend = backend or CLEAN_BACKEND
     try:
-        soup = BeautifulSoup(html_text, 'html.parser')
-        return soup.get_text(separator=' ').strip()
+        with span("clean"):
+            if backend == "bs4":
+                return strip_html_soup(html_text)
+            if backend == "lxml":
+                return strip_html_soup(html_text, 'lxml')
+            return strip_html(html_text, max_chars)
     except Exception as e:
-        return ""
\ No newline at end of file
+        return ""
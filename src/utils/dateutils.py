@@ -1,5 +1,13 @@
+import re
+import time
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from typing import Optional
+from src.utils.metrics import span
+
+DATE_CACHE_SIZE = 4096
+TZ_WITHOUT_COLON = re.compile(r"([+-]\d{2})(\d{2})$")
 
 def to_utc(date):
     """
@@ -34,4 +42,50 @@ def update_last_published_date(current_last_date, new_date):
 
     if current_last_date is None or new_date > current_last_date:
         return new_date
-    return current_last_date
\ No newline at end of file
+    return current_last_date
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_fixed_date(value: str) -> Optional[datetime]:
+    """
+    Быстрый разбор ISO-8601 и RFC 2822 без dateparser.
+    :return: datetime в UTC или None, если строка в другом формате.
+    """
+    iso_value = value[:-1] + "+00:00" if value.endswith(("Z", "z")) else value
+    iso_value = TZ_WITHOUT_COLON.sub(r"\1:\2", iso_value)
+    try:
+        return to_utc(datetime.fromisoformat(iso_value))
+    except ValueError:
+        pass
+
+    try:
+        rfc_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        rfc_date = None
+    return to_utc(rfc_date) if rfc_date else None
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_freeform_date(value: str, hour: int) -> Optional[datetime]:
+    """
+    Разбор свободных строк через dateparser.
+    Относительные даты («2 days ago») зависят от текущего времени,
+    поэтому кэш действует в пределах одного часа (hour).
+    dateparser загружается только при первой такой строке.
+    """
+    from dateparser import parse
+    parsed = parse(value, settings={'TIMEZONE': 'UTC', 'TO_TIMEZONE': 'UTC'})
+    return to_utc(parsed) if parsed else None
+
+def parse_date(value: str) -> Optional[datetime]:
+    """
+    Разбирает дату из API в datetime UTC.
+    Сначала пробует быстрые ISO-8601 и RFC 2822, к dateparser
+    обращается только для свободных строк вида «2 days ago».
+    Результаты кэшируются в LRU-кэше на DATE_CACHE_SIZE строк.
+    :param value: Строка с датой.
+    :return: datetime в UTC или None, если разобрать не удалось.
+    """
+    value = value.strip() if value else ""
+    if not value:
+        return None
+    with span("date"):
+        return parse_fixed_date(value) or parse_freeform_date(value, int(time.time() // 3600))
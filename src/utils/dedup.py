@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from constants import DEDUP_FILE, DEDUP_TTL_DAYS
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAMS = {"ref", "source", "src", "gh_src", "fbclid", "gclid", "lever-source", "lever-origin"}
+TITLE_STOPWORDS = {"remote", "the", "a", "an", "and", "or", "of", "for", "in", "at", "to", "with", "job", "position", "m", "f", "d", "w"}
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "limited", "gmbh", "corp", "corporation", "co", "company", "sa", "ag", "bv", "plc", "ооо", "ао"}
+EMPTY_VALUES = {"", "#", "none", "not specified", "no link", "не указано"}
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize_url(url: Optional[str]) -> Optional[str]:
+    """
+    Приводит ссылку на вакансию к каноническому виду:
+    без схемы, www, порта по умолчанию, завершающего слэша и UTM-меток.
+    """
+    if not url or url.strip().lower() in EMPTY_VALUES:
+        return None
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if not host:
+        return None
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return f"{host}{path}?{urlencode(query)}" if query else f"{host}{path}"
+
+
+def fingerprint(title: Optional[str], company: Optional[str]) -> Optional[str]:
+    """
+    Нечёткий отпечаток вакансии по названию и компании:
+    регистр, порядок слов, пунктуация и юридическая форма компании не важны.
+    Без компании отпечаток не строится — одного названия мало для совпадения.
+    """
+    if not title or not company or company.strip().lower() in EMPTY_VALUES:
+        return None
+    title_tokens = sorted(set(WORD_RE.findall(title.lower())) - TITLE_STOPWORDS)
+    company_tokens = [t for t in WORD_RE.findall(company.lower()) if t not in COMPANY_SUFFIXES]
+    if not title_tokens or not company_tokens:
+        return None
+    raw = " ".join(title_tokens) + "|" + " ".join(company_tokens)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class DedupIndex:
+    """
+    Постоянный индекс уже опубликованных вакансий из всех источников.
+    Вакансия попадает в индекс только после успешной отправки: если Telegram
+    её не принял, в следующем запуске она не считается дубликатом.
+    Ключи — нормализованная ссылка и отпечаток название+компания,
+    значения — время добавления; записи старше ttl удаляются.
+    """
+    def __init__(self, path: str = DEDUP_FILE, ttl_days: int = DEDUP_TTL_DAYS):
+        self.path = path
+        self.ttl = ttl_days * 24 * 3600
+        self.entries: Dict[str, float] = {}
+        self.duplicates: Counter = Counter()
+        # Ключи вакансий, пропущенных в этом запуске, но ещё не отправленных
+        self.reserved: Set[str] = set()
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as file:
+                self.entries = json.load(file)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error("Ошибка при загрузке индекса дубликатов %s: %s", self.path, e)
+            self.entries = {}
+        self.prune()
+
+    def save(self) -> None:
+        """
+        Атомарно сохраняет индекс: запись во временный файл и переименование.
+        """
+        self.prune()
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as file:
+                json.dump(self.entries, file)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("Ошибка при сохранении индекса дубликатов %s: %s", self.path, e)
+
+    def prune(self) -> None:
+        border = time.time() - self.ttl
+        self.entries = {key: seen_at for key, seen_at in self.entries.items() if seen_at >= border}
+
+    @staticmethod
+    def keys(url: Optional[str], title: Optional[str], company: Optional[str]) -> List[str]:
+        keys = []
+        normalized_url = normalize_url(url)
+        if normalized_url:
+            keys.append(f"u:{normalized_url}")
+        title_print = fingerprint(title, company)
+        if title_print:
+            keys.append(f"f:{title_print}")
+        return keys
+
+    def check_and_reserve(self, source: str, url: Optional[str], title: Optional[str], company: Optional[str]) -> bool:
+        """
+        Проверяет, публиковалась ли вакансия, и резервирует её ключи в памяти
+        на время запуска, чтобы отсеять её копии из других источников.
+        В постоянный индекс ключи попадают только через add — после отправки.
+        :return: True, если вакансия новая; False, если это дубликат.
+        """
+        keys = self.keys(url, title, company)
+        if any(key in self.entries or key in self.reserved for key in keys):
+            self.duplicates[source] += 1
+            return False
+        self.reserved.update(keys)
+        return True
+
+    def add(self, url: Optional[str], title: Optional[str], company: Optional[str]) -> None:
+        """
+        Запоминает опубликованную вакансию в постоянном индексе и сразу
+        сохраняет его: падение посреди запуска не приводит к повторам.
+        """
+        keys = self.keys(url, title, company)
+        if not keys:
+            return
+        now = time.time()
+        for key in keys:
+            self.entries[key] = now
+        self.save()
+
+    def report(self) -> None:
+        if not self.duplicates:
+            logger.info("Дубликатов за запуск не найдено")
+            return
+        for source, count in self.duplicates.most_common():
+            logger.info("Дубликатов от %s: %s", source, count)
@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+from collections import Counter
+from typing import Dict, Mapping, Optional
+from constants import HTTP_CACHE_FILE
+
+logger = logging.getLogger(__name__)
+
+
+class ValidatorCache:
+    """
+    Кэш валидаторов HTTP (ETag / Last-Modified) по URL на диске.
+    Лента запрашивается с If-None-Match / If-Modified-Since; на 304 Not Modified
+    тело не скачивается и не разбирается. Для отчёта хранится размер
+    последнего полного ответа — столько байт экономит каждый 304.
+    """
+    def __init__(self, path: str = HTTP_CACHE_FILE):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.saved_bytes: Counter = Counter()
+        self.not_modified_count: Counter = Counter()
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as file:
+                self.entries = json.load(file)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error("Ошибка при загрузке HTTP-кэша %s: %s", self.path, e)
+            self.entries = {}
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as file:
+                json.dump(self.entries, file)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("Ошибка при сохранении HTTP-кэша %s: %s", self.path, e)
+
+    def headers(self, url: str) -> Dict[str, str]:
+        """
+        Заголовки условного запроса для url (пустые, если валидаторов нет).
+        """
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, response_headers: Mapping[str, str], size: int) -> None:
+        """
+        Запоминает валидаторы полного (200) ответа и его размер.
+        """
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self.entries.pop(url, None)
+            return
+        self.entries[url] = {"etag": etag, "last_modified": last_modified, "size": size}
+
+    def not_modified(self, url: str, source: str) -> None:
+        """
+        Учитывает ответ 304 для источника source.
+        """
+        self.not_modified_count[source] += 1
+        self.saved_bytes[source] += (self.entries.get(url) or {}).get("size", 0)
+        logger.info("%s: %s не изменился (304), разбор пропущен", source, url)
+
+    def report(self) -> None:
+        """
+        Пишет в лог сэкономленные за запуск байты по источникам и сбрасывает счётчики.
+        """
+        for source, count in self.not_modified_count.items():
+            logger.info("%s: ответов 304 — %s, сэкономлено %.1f КБ", source, count, self.saved_bytes[source] / 1024)
+        self.saved_bytes.clear()
+        self.not_modified_count.clear()
+
+
+_cache: Optional[ValidatorCache] = None
+
+
+def get_http_cache() -> ValidatorCache:
+    """
+    Общий кэш валидаторов процесса, загружается при первом обращении.
+    """
+    global _cache
+    if _cache is None:
+        _cache = ValidatorCache()
+    return _cache
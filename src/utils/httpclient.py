@@ -0,0 +1,18 @@
+import aiohttp
+from constants import HTTP_LIMIT, HTTP_LIMIT_PER_HOST, HTTP_KEEPALIVE, HTTP_DNS_TTL
+
+
+def create_session() -> aiohttp.ClientSession:
+    """
+    Создаёт HTTP-сессию с общим пулом соединений для всех парсеров.
+    Соединения держатся открытыми (keep-alive), DNS-ответы кэшируются.
+    :return: aiohttp.ClientSession, которую нужно закрыть после использования.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE,
+        ttl_dns_cache=HTTP_DNS_TTL,
+        use_dns_cache=True
+    )
+    return aiohttp.ClientSession(connector=connector)
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+import aiohttp
+from constants import HTTP_RETRIES, HTTP_RETRY_BACKOFF, HTTP_RETRY_MAX_DELAY
+from constants import BREAKER_THRESHOLD, BREAKER_COOLDOWN, BREAKER_MAX_COOLDOWN
+from src.utils.metrics import HTTP_REQUESTS, RETRIES
+
+logger = logging.getLogger(__name__)
+
+# Временные ошибки сервера и ограничения частоты: запрос имеет смысл повторить
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Источник временно отключён: запросы к нему не выполняются до конца паузы."""
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Предохранитель источника. После threshold неудачных запросов подряд
+    (каждый — уже после всех повторов) источник отключается на cooldown сек.;
+    каждое следующее отключение вдвое длиннее, но не больше max_cooldown.
+    По истечении паузы пропускается пробный запрос: успех сбрасывает
+    предохранитель, ошибка снова его размыкает.
+    """
+    threshold: int = BREAKER_THRESHOLD
+    cooldown: float = BREAKER_COOLDOWN
+    max_cooldown: float = BREAKER_MAX_COOLDOWN
+    failures: int = 0
+    openings: int = 0
+    open_until: float = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self.open_until
+
+    def retry_in(self) -> float:
+        """Сколько секунд осталось до пробного запроса."""
+        return max(self.open_until - time.monotonic(), 0.0)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.openings = 0
+        self.open_until = 0.0
+
+    def record_failure(self) -> bool:
+        """
+        :return: True, если после этой ошибки предохранитель разомкнулся.
+        """
+        self.failures += 1
+        if self.failures < self.threshold:
+            return False
+        pause = min(self.cooldown * 2 ** self.openings, self.max_cooldown)
+        self.openings += 1
+        self.open_until = time.monotonic() + pause
+        return True
+
+
+# Предохранители по ключу источника; живут, пока работает процесс
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(source: str) -> CircuitBreaker:
+    breaker = _BREAKERS.get(source)
+    if breaker is None:
+        breaker = _BREAKERS[source] = CircuitBreaker()
+    return breaker
+
+
+def record_failure(source: str, reason: object) -> None:
+    """Учитывает неудачу источника и сообщает в лог, если он отключён."""
+    breaker = get_breaker(source)
+    if breaker.record_failure():
+        logger.error(
+            "%s: %s ошибок подряд (последняя: %s), источник отключён на %.0f мин.",
+            source, breaker.failures, reason, breaker.retry_in() / 60
+        )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Значение заголовка Retry-After в секундах: число или HTTP-дата.
+    :return: None, если заголовка нет или он не разобран.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+    """
+    Пауза перед повтором номер attempt + 1. Если сервер прислал Retry-After,
+    ждём столько, сколько он просит; иначе экспоненциальная пауза со случайным
+    разбросом (full jitter), чтобы параллельные запросы не повторялись разом.
+    :return: None, если ждать дольше HTTP_RETRY_MAX_DELAY: время запуска
+        важнее, запрос считается неудачным.
+    """
+    delay = parse_retry_after(retry_after)
+    if delay is None:
+        delay = random.uniform(0, HTTP_RETRY_BACKOFF * 2 ** attempt)
+    return delay if delay <= HTTP_RETRY_MAX_DELAY else None
+
+
+@asynccontextmanager
+async def request(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    source: str,
+    retries: int = HTTP_RETRIES,
+    **kwargs
+) -> AsyncIterator[aiohttp.ClientResponse]:
+    """
+    Общий запрос к источнику: session.request с повторами и предохранителем.
+    Ошибки соединения, таймауты и ответы из RETRY_STATUSES повторяются до
+    retries раз. Ответ с другим кодом (в том числе 4xx) отдаётся как есть,
+    проверять его статус — дело вызывающего.
+    Предохранитель источника учитывает неудачу после всех повторов и ответы
+    4xx без повторов; успехом считаются только 2xx и 304.
+    :param source: Ключ источника для метрик и предохранителя.
+    :raises CircuitOpenError: Источник отключён предохранителем.
+    :raises aiohttp.ClientError, asyncio.TimeoutError: Ошибка последней попытки.
+    """
+    breaker = get_breaker(source)
+    if breaker.is_open:
+        raise CircuitOpenError(f"{source} отключён после {breaker.failures} ошибок подряд, пробный запрос через {breaker.retry_in():.0f} сек.")
+    attempt = 0
+    while True:
+        try:
+            response = await session.request(method, url, **kwargs)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            HTTP_REQUESTS.inc(source, "error")
+            reason = type(e).__name__
+            delay = backoff_delay(attempt) if attempt < retries else None
+            if delay is None:
+                record_failure(source, reason)
+                raise
+        else:
+            HTTP_REQUESTS.inc(source, str(response.status))
+            if response.status not in RETRY_STATUSES:
+                # Успех — только 2xx и 304. Остальные ошибки (401 с неверным ключом,
+                # 403 с капчей) не повторяются, но предохранитель их учитывает
+                if 200 <= response.status < 300 or response.status == 304:
+                    breaker.record_success()
+                else:
+                    record_failure(source, response.status)
+                break
+            reason = str(response.status)
+            delay = backoff_delay(attempt, response.headers.get("Retry-After")) if attempt < retries else None
+            if delay is None:
+                record_failure(source, reason)
+                break
+            response.release()
+        attempt += 1
+        RETRIES.inc(source, reason)
+        logger.warning("%s: %s от %s, повтор %s/%s через %.1f сек.", source, reason, url, attempt, retries, delay)
+        await asyncio.sleep(delay)
+    async with response:
+        yield response
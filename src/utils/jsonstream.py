@@ -0,0 +1,141 @@
+import codecs
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Mapping, Optional, Tuple
+import aiohttp
+from constants import JSON_CHUNK_SIZE
+from src.utils.httpcache import get_http_cache
+from src.utils.metrics import observe
+from src.utils.httpretry import request
+
+WHITESPACE = " \t\n\r"
+# Что может стоять после элемента массива
+DELIMITERS = WHITESPACE + ",]"
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Потоково разбирает JSON-массив верхнего уровня: каждый элемент отдаётся,
+    как только он полностью получен, и весь массив в памяти не собирается.
+    :param chunks: Куски тела ответа в UTF-8.
+    :raises ValueError: Если данные — не JSON-массив или обрываются.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = False
+    finished = False
+    eof = False
+    chunk_iter = chunks.__aiter__()
+
+    while not finished:
+        try:
+            chunk = await chunk_iter.__anext__()
+            buffer += text_decoder.decode(chunk)
+        except StopAsyncIteration:
+            buffer += text_decoder.decode(b"", final=True)
+            eof = True
+
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] == "﻿":
+                    pos += 1
+                    continue
+                if buffer[pos] != "[":
+                    raise ValueError(f"Ожидался JSON-массив, получено: {buffer[pos:pos + 20]!r}")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                finished = True
+                break
+            if buffer[pos] == ",":
+                pos += 1
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Элемент ещё не получен целиком
+                if eof:
+                    raise
+                break
+            # Число, разрезанное границей куска, разбирается частично: «12.» — как 12,
+            # «1e» — как 1. Значение принимается, только если за ним уже пришёл разделитель
+            if not eof and (end >= len(buffer) or buffer[end] not in DELIMITERS):
+                break
+            yield value
+            pos = end
+
+        buffer = buffer[pos:]
+        if eof and not finished:
+            raise ValueError("JSON-массив оборвался до закрывающей скобки")
+
+
+async def fetch_json_array(
+    session: aiohttp.ClientSession,
+    url: str,
+    source: str,
+    validators: Dict[str, Tuple[Mapping[str, str], int]],
+    headers: Optional[Dict[str, str]] = None,
+    **kwargs
+) -> AsyncIterator[Any]:
+    """
+    Запрашивает ленту-массив с условными заголовками (с повторами при временных
+    ошибках) и отдаёт элементы по мере чтения ответа.
+    На 304 Not Modified ничего не отдаёт.
+    :param source: Ключ источника для отчёта о сэкономленных байтах.
+    :param validators: Сюда кладутся заголовки и размер ответа, если он прочитан
+        целиком. В кэш их сохраняет вызывающий, когда обработает все элементы:
+        чтение ответа может опережать обработку (пачки normalize_stream).
+    :raises aiohttp.ClientError, ValueError: Ошибки запроса и разбора.
+    """
+    cache = get_http_cache()
+    request_headers = dict(headers or {}, **cache.headers(url))
+    # Чтение ответа и разбор JSON чередуются: время ожидания данных из сети
+    # считается как fetch, остальное время получения элемента — как decode
+    fetch = decode = 0.0
+    started = time.perf_counter()
+    async with request(session, "GET", url, source, headers=request_headers, **kwargs) as response:
+        fetch += time.perf_counter() - started
+        if response.status == 304:
+            cache.not_modified(url, source)
+            observe("fetch", fetch, source)
+            return
+        response.raise_for_status()
+        size = 0
+
+        async def chunks() -> AsyncIterator[bytes]:
+            nonlocal size, fetch
+            reader = response.content.iter_chunked(JSON_CHUNK_SIZE).__aiter__()
+            while True:
+                started = time.perf_counter()
+                try:
+                    chunk = await reader.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    fetch += time.perf_counter() - started
+                size += len(chunk)
+                yield chunk
+
+        items = iter_json_array(chunks()).__aiter__()
+        try:
+            while True:
+                started = time.perf_counter()
+                waited = fetch
+                try:
+                    item = await items.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    decode += time.perf_counter() - started - (fetch - waited)
+                yield item
+        finally:
+            observe("fetch", fetch, source)
+            observe("decode", decode, source)
+        validators[url] = (response.headers, size)
@@ -0,0 +1,195 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern
+from constants import KEYWORDS_MIN_SCORE
+from src.utils.metrics import span
+
+# Вес совпадения в зависимости от поля: слово в названии важнее, чем в описании
+FIELD_WEIGHTS = {"title": 3, "tags": 2, "description": 1}
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Собирает регулярное выражение из префиксного дерева терминов.
+    Общие префиксы выносятся за скобки, поэтому на каждой позиции текста
+    regex проверяет одну ветку, а не все термины по очереди.
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        pattern = "(?:" + "|".join(branches) + ")"
+        return pattern + "?" if is_end else pattern
+
+    return build(trie)
+
+
+WORD_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1)
+def _separator_table() -> Dict[int, str]:
+    r"""
+    Таблица для str.translate: все символы, не входящие в \w, заменяются пробелом.
+    translate + split в несколько раз быстрее, чем re.findall(r"\w+").
+    """
+    return {
+        code: " " for code in range(0x10000)
+        if not chr(code).isspace() and not WORD_RE.fullmatch(chr(code))
+    }
+
+
+def _tokens(text: str) -> List[str]:
+    # Таблица покрывает только BMP: эмодзи (🚀, 💻) и другие символы за её
+    # пределами остались бы внутри токена, поэтому такой текст режется regex
+    if text and max(text) > "\uffff":
+        return WORD_RE.findall(text)
+    return text.translate(_separator_table()).split()
+
+
+def _compile(terms: List[str]) -> Optional[Pattern]:
+    if not terms:
+        return None
+    # Правая граница слова — в самом выражении. Левую проверяет _bounded():
+    # без lookbehind в начале sre быстро пропускает позиции по первому символу
+    return re.compile(_trie_pattern(terms) + r"(?!\w)")
+
+
+def _bounded(pattern: Pattern, text: str):
+    """
+    Совпадения pattern, перед которыми нет символа слова:
+    «java» не совпадает с «javascript» и «ajava», «c++» и «node.js» работают.
+    """
+    for match in pattern.finditer(text):
+        start = match.start()
+        if start == 0 or not WORD_RE.match(text, start - 1):
+            yield match
+
+
+class _TermSet:
+    """
+    Набор терминов, разделённый по способу поиска: термины из одного слова
+    ищутся по множеству токенов текста (O(длина текста)), остальные
+    («node.js», «c++», «front end») — одним регулярным выражением.
+    """
+    def __init__(self, terms: Iterable[str]):
+        terms = sorted({term.strip().lower() for term in terms if term and term.strip()})
+        self.terms = terms
+        self.words = frozenset(term for term in terms if WORD_RE.fullmatch(term))
+        self.phrases = [term for term in terms if term not in self.words]
+        self.pattern = _compile(self.phrases)
+
+    def __bool__(self) -> bool:
+        return bool(self.terms)
+
+    def count(self, text: str) -> int:
+        """
+        Число вхождений терминов в уже приведённый к нижнему регистру текст.
+        """
+        found = 0
+        if self.words:
+            found += sum(1 for token in _tokens(text) if token in self.words)
+        if self.pattern and self._may_contain_phrase(text):
+            found += sum(1 for _ in _bounded(self.pattern, text))
+        return found
+
+    def search(self, text: str) -> bool:
+        if self.words and not self.words.isdisjoint(_tokens(text)):
+            return True
+        return bool(self.pattern) and self._may_contain_phrase(text) and \
+            next(_bounded(self.pattern, text), None) is not None
+
+    def _may_contain_phrase(self, text: str) -> bool:
+        # Составных терминов обычно единицы: проверка подстрокой дешевле прохода regex
+        return any(phrase in text for phrase in self.phrases)
+
+
+class KeywordMatcher:
+    """
+    Фильтр вакансий по ключевым словам, собирается один раз из KEYWORDS.
+    Строка — термины через запятую; термин с минусом впереди исключает вакансию
+    (например "frontend, react, -php"). Совпадения в полях суммируются с весами
+    FIELD_WEIGHTS, вакансия проходит при сумме не меньше min_score.
+    """
+    def __init__(self, include: Iterable[str], exclude: Iterable[str] = (), min_score: int = 1):
+        self.include = _TermSet(include)
+        self.exclude = _TermSet(exclude)
+        self.min_score = min_score
+
+    @classmethod
+    def from_string(cls, keywords: Optional[str], min_score: int = 1) -> "KeywordMatcher":
+        include, exclude = [], []
+        for raw in (keywords or "").split(","):
+            term = raw.strip()
+            if term.startswith("-"):
+                exclude.append(term[1:])
+            elif term:
+                include.append(term)
+        return cls(include, exclude, min_score)
+
+    @staticmethod
+    def _fields(title: str, description: str, tags: Iterable[str]):
+        # Сначала поля с большим весом: порог набирается быстрее
+        return (
+            ("title", (title or "").lower()),
+            ("tags", " ".join(tags).lower()),
+            ("description", (description or "").lower()),
+        )
+
+    def score(self, title: str = "", description: str = "", tags: Iterable[str] = ()) -> int:
+        """
+        Возвращает взвешенное число совпадений или -1, если найдено исключающее слово.
+        """
+        fields = self._fields(title, description, tags)
+        if self.exclude and any(self.exclude.search(text) for _, text in fields if text):
+            return -1
+        if not self.include:
+            return 0
+        return sum(FIELD_WEIGHTS[name] * self.include.count(text) for name, text in fields if text)
+
+    def matches(self, title: str = "", description: str = "", tags: Iterable[str] = ()) -> bool:
+        """
+        Проходит ли вакансия фильтр. Без включающих слов проходит всё, кроме исключений.
+        Подсчёт останавливается, как только набран min_score.
+        """
+        with span("filter"):
+            return self._matches(title, description, tags)
+
+    def _matches(self, title: str, description: str, tags: Iterable[str]) -> bool:
+        fields = self._fields(title, description, tags)
+        if self.exclude and any(self.exclude.search(text) for _, text in fields if text):
+            return False
+        if not self.include:
+            return True
+        score = 0
+        for name, text in fields:
+            if not text:
+                continue
+            if self.min_score <= score + FIELD_WEIGHTS[name]:
+                if self.include.search(text):
+                    return True
+            else:
+                score += FIELD_WEIGHTS[name] * self.include.count(text)
+                if score >= self.min_score:
+                    return True
+        return False
+
+
+@lru_cache(maxsize=None)
+def get_matcher(keywords: Optional[str], min_score: int = KEYWORDS_MIN_SCORE) -> KeywordMatcher:
+    """
+    Общий матчер для строки ключевых слов: регулярное выражение компилируется один раз на процесс.
+    :param min_score: Порог взвешенной суммы совпадений. При 1 хватает любого совпадения;
+        при 3 слово только в описании не проходит, а в названии — проходит.
+    """
+    return KeywordMatcher.from_string(keywords, int(min_score))
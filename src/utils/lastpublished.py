@@ -1,30 +1,22 @@
-import os
-import json
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
+from src.utils.statestore import get_state_store
 
 
-
-def load_last_published_date(LAST_PUBLISHED_FILE):
+def load_last_published_date(source: str, lookback: timedelta = timedelta(0)) -> Optional[datetime]:
     """
-    Загружает дату последней обработки вакансий из файла.
-    :return: datetime или None, если файл отсутствует или пуст.
+    Загружает дату последней обработки вакансий источника из хранилища состояния.
+    :param source: Ключ источника.
+    :param lookback: Насколько сдвинуть дату назад (повторы отсекаются по ID).
+    :return: datetime или None, если источник ещё не обрабатывался.
     """
-    if os.path.exists(LAST_PUBLISHED_FILE):
-        try:
-            with open(LAST_PUBLISHED_FILE, "r") as file:
-                data = json.load(file)
-                return datetime.fromisoformat(data["last_published_date"])
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
-            print(f"Ошибка при загрузке last_published_date: {e}")
-    return None
+    return get_state_store().load_watermark(source, lookback)
 
-def save_last_published_date(date,LAST_PUBLISHED_FILE):
+def save_last_published_date(date, source: str):
     """
-    Сохраняет дату последней обработки вакансий в файл.
+    Сохраняет дату последней обработки вакансий источника.
+    Запись попадает в базу вместе с остальным состоянием запуска.
     :param date: datetime объект, который нужно сохранить.
+    :param source: Ключ источника.
     """
-    try:
-        with open(LAST_PUBLISHED_FILE, "w") as file:
-            json.dump({"last_published_date": date.isoformat()}, file)
-    except Exception as e:
-        print(f"Ошибка при сохранении last_published_date: {e}")
\ No newline at end of file
+    get_state_store().save_watermark(source, date)
@@ -0,0 +1,79 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+from constants import LOG_LEVEL, LOG_DIR, LOG_QUEUE, LOG_SAMPLE_EVERY
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: str = LOG_LEVEL, log_dir: str = LOG_DIR, use_queue: bool = LOG_QUEUE) -> None:
+    """
+    Единая настройка логирования процесса: консоль и файл logs/bot.log
+    с ротацией (5 МБ на файл, 5 резервных копий). Вызывается один раз
+    из точки входа; модули только получают логгер через getLogger.
+    :param use_queue: Записи из цикла событий кладутся в очередь, а в консоль
+        и файл их пишет отдельный поток QueueListener — запись на диск
+        не блокирует цикл событий.
+    """
+    global _listener
+    root = logging.getLogger()
+    if _listener is not None or root.handlers:
+        return
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [
+        logging.StreamHandler(),
+        RotatingFileHandler(os.path.join(log_dir, "bot.log"), maxBytes=5 * 1024 * 1024, backupCount=5, encoding="utf-8")
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    root.setLevel(getattr(logging, level, logging.INFO))
+    if not use_queue:
+        for handler in handlers:
+            root.addHandler(handler)
+        return
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(records))
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Дописывает оставшиеся в очереди записи и останавливает поток записи."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class SampledLog:
+    """
+    Журнал событий по отдельным вакансиям: считает каждое событие, а в лог
+    (по умолчанию на уровне DEBUG) пишет только первое и каждое every-е.
+    Сообщение форматируется лениво и только для попавших в выборку записей;
+    итог за запуск выводит summary.
+    """
+    __slots__ = ("logger", "message", "level", "every", "count")
+
+    def __init__(self, logger: logging.Logger, message: str, level: int = logging.DEBUG, every: int = LOG_SAMPLE_EVERY):
+        self.logger = logger
+        self.message = message
+        self.level = level
+        self.every = max(every, 1)
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+        if (self.count - 1) % self.every == 0 and self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, self.message + " (#%d)", *args, self.count)
+
+    def summary(self, message: str, *args, level: int = logging.INFO) -> None:
+        """Итог за запуск; к args добавляется число событий (%d в конце message)."""
+        if self.count:
+            self.logger.log(level, message, *args, self.count)
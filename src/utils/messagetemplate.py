@@ -0,0 +1,143 @@
+import json
+import logging
+from datetime import date
+from functools import lru_cache
+from string import Formatter
+from typing import Callable, Dict, List, Tuple
+from constants import TEMPLATES_FILE, TELEGRAM_MESSAGE_LIMIT
+from src.parsers.vacancy import Vacancy, NOT_SPECIFIED
+from src.utils.escapehtml import escape_html
+from src.utils.telegramhtml import truncate_html, visible_length
+
+logger = logging.getLogger(__name__)
+
+# Шаблон, если в файле нет ни шаблона источника, ни "default"
+FALLBACK_TEMPLATE = (
+    "💼 <b>{title}</b>\n"
+    "📍 Location: {flag} {location}\n\n"
+    "📅 Published: {published}\n\n"
+    "🏢 Company: {company}\n"
+    "📝 Description: {description}\n\n"
+    "👉 <a href=\"{url}\">APPLY NOW</a>\n\n"
+    "{hashtags}"
+)
+
+
+@lru_cache(maxsize=4096)
+def escape_repeated(text: str) -> str:
+    """
+    Экранирование для полей с небольшим набором значений (локация, компания, опыт):
+    одно и то же значение экранируется один раз за время работы.
+    """
+    return escape_html(text)
+
+
+def escape_attribute(text: str) -> str:
+    return escape_html(text).replace('"', "&quot;")
+
+
+@lru_cache(maxsize=1024)
+def format_date(day: date) -> str:
+    return day.strftime('%d %B %Y')
+
+
+@lru_cache(maxsize=1024)
+def render_hashtags(tags: Tuple[str, ...]) -> str:
+    return " ".join(escape_html(tag) for tag in tags if tag)
+
+
+# Поля шаблона: значение уже экранировано для HTML-разметки Telegram
+FIELDS: Dict[str, Callable[[Vacancy], str]] = {
+    "title": lambda vacancy: escape_html(vacancy.title),
+    "url": lambda vacancy: escape_attribute(vacancy.url),
+    "description": lambda vacancy: escape_html(vacancy.description),
+    "company": lambda vacancy: escape_repeated(vacancy.company or NOT_SPECIFIED),
+    "location": lambda vacancy: escape_repeated(vacancy.location or NOT_SPECIFIED),
+    "flag": lambda vacancy: vacancy.flag,
+    "published": lambda vacancy: format_date(vacancy.published_at.date()),
+    "salary": lambda vacancy: escape_repeated(vacancy.salary),
+    "experience": lambda vacancy: escape_repeated(vacancy.experience or NOT_SPECIFIED),
+    "language": lambda vacancy: escape_repeated(vacancy.language or NOT_SPECIFIED),
+    "source": lambda vacancy: escape_repeated(vacancy.source),
+    "hashtags": lambda vacancy: render_hashtags(vacancy.tags),
+}
+
+
+class MessageTemplate:
+    """
+    Шаблон сообщения, проверенный и разобранный один раз в строку %-форматирования:
+    при рендере вычисляются только поля, которые в нём есть, каждое экранируется
+    один раз. Если сообщение длиннее лимита Telegram, сокращается описание,
+    а в крайнем случае — всё сообщение.
+    """
+    def __init__(self, name: str, source: str, limit: int = TELEGRAM_MESSAGE_LIMIT):
+        self.name = name
+        self.limit = limit
+        parts = []
+        self.getters: List[Callable[[Vacancy], str]] = []
+        self.fields: List[str] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            parts.append(literal.replace("%", "%%"))
+            if field is None:
+                continue
+            if field not in FIELDS:
+                raise ValueError(f"Шаблон {name}: неизвестное поле {{{field}}}")
+            if spec or conversion:
+                raise ValueError(f"Шаблон {name}: форматирование поля {{{field}}} не поддерживается")
+            parts.append("%s")
+            self.fields.append(field)
+            self.getters.append(FIELDS[field])
+        self.format = "".join(parts)
+
+    def render(self, vacancy: Vacancy) -> str:
+        values = [getter(vacancy) for getter in self.getters]
+        text = self.format % tuple(values)
+        # UTF-16 длина не больше удвоенной длины строки: обычные сообщения точный подсчёт не проходят
+        if len(text) * 2 <= self.limit:
+            return text
+        length = visible_length(text)
+        if length <= self.limit:
+            return text
+
+        if "description" in self.fields:
+            index = self.fields.index("description")
+            budget = visible_length(values[index]) - (length - self.limit)
+            if budget > 0:
+                values[index] = truncate_html(values[index], budget)
+                text = self.format % tuple(values)
+        return truncate_html(text, self.limit)
+
+
+def parse_template(value) -> str:
+    """Шаблон в файле — строка или список строк (склеиваются через перевод строки)."""
+    return "\n".join(value) if isinstance(value, list) else value
+
+
+@lru_cache(maxsize=1)
+def load_templates(path: str = TEMPLATES_FILE) -> Dict[str, MessageTemplate]:
+    """
+    Загружает и компилирует все шаблоны из файла один раз за время работы.
+    :raises ValueError: Если в шаблоне неизвестное поле.
+    """
+    raw = {}
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            raw = json.load(file)
+    except FileNotFoundError:
+        logger.warning("Файл шаблонов %s не найден, используется шаблон по умолчанию", path)
+    templates = {name: MessageTemplate(name, parse_template(value)) for name, value in raw.items()}
+    templates.setdefault("default", MessageTemplate("default", FALLBACK_TEMPLATE))
+    logger.info("Скомпилировано шаблонов сообщений: %s (%s)", len(templates), ', '.join(templates))
+    return templates
+
+
+def get_template(*names: str) -> MessageTemplate:
+    """
+    Первый найденный шаблон по именам (например, имя источника, затем тип парсера),
+    иначе "default".
+    """
+    templates = load_templates()
+    for name in names:
+        if name in templates:
+            return templates[name]
+    return templates["default"]
@@ -0,0 +1,154 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Источник, для которого сейчас выполняется код: задаётся конвейером на время работы
+# парсера и наследуется его задачами, поэтому очистка HTML и разбор дат
+# попадают в метрики своего источника без явной передачи имени
+current_source: ContextVar[str] = ContextVar("current_source", default="")
+
+# Текстовый формат экспозиции Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Границы корзин гистограмм длительности, сек.
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    """Монотонный счётчик с метками (значения меток передаются позиционно)."""
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        REGISTRY.append(self)
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, labels)} {format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными корзинами. Хранит число попаданий в каждую
+    корзину, сумму и количество; накопительные значения считаются при выдаче.
+    """
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # метки → [счётчики корзин (+Inf последней), сумма, количество]
+        self.values: Dict[Tuple[str, ...], list] = {}
+        REGISTRY.append(self)
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, hits in zip(self.buckets + (float("inf"),), counts):
+                cumulative += hits
+                le = "+Inf" if bound == float("inf") else format_value(bound)
+                lines.append(f"{self.name}_bucket{format_labels(self.labels + ('le',), labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, labels)} {total!r}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, labels)} {count}")
+        return lines
+
+
+REGISTRY: List = []
+
+STAGE_SECONDS = Histogram(
+    "frontjobs_stage_seconds",
+    "Длительность этапов обработки по источникам: fetch, decode, clean, date, filter, format, send и др.",
+    ("source", "stage")
+)
+VACANCIES = Counter(
+    "frontjobs_vacancies_total",
+    "Вакансии по источникам и исходу: fetched, seen, duplicate, queued, published.",
+    ("source", "outcome")
+)
+PARSER_RUNS = Counter(
+    "frontjobs_parser_runs_total",
+    "Запуски парсеров по результату: ok, timeout, error, skipped.",
+    ("source", "result")
+)
+HTTP_REQUESTS = Counter(
+    "frontjobs_http_requests_total",
+    "HTTP-запросы к источникам по коду ответа.",
+    ("source", "status")
+)
+RETRIES = Counter(
+    "frontjobs_http_retries_total",
+    "Повторы HTTP-запросов к источникам по причине: код ответа или тип ошибки.",
+    ("source", "reason")
+)
+TELEGRAM_MESSAGES = Counter(
+    "frontjobs_telegram_messages_total",
+    "Сообщения в Telegram по результату: sent, failed, retry, flood_wait.",
+    ("result",)
+)
+
+
+class Span:
+    """Замер длительности блока кода в STAGE_SECONDS (with span("clean"): ...)."""
+    __slots__ = ("stage", "source", "started")
+
+    def __init__(self, stage: str, source: Optional[str] = None):
+        self.stage = stage
+        self.source = source
+        self.started = 0.0
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, self.source or current_source.get(), self.stage)
+        return False
+
+
+def span(stage: str, source: Optional[str] = None) -> Span:
+    """
+    :param source: Источник; по умолчанию — текущий из current_source.
+    """
+    return Span(stage, source)
+
+
+def observe(stage: str, seconds: float, source: Optional[str] = None) -> None:
+    """Записывает уже измеренную длительность (например, суммарную за ответ)."""
+    STAGE_SECONDS.observe(seconds, source or current_source.get(), stage)
+
+
+def render_metrics() -> str:
+    """Все метрики процесса в текстовом формате Prometheus."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+from constants import NORMALIZE_WORKERS, NORMALIZE_EXECUTOR, NORMALIZE_BATCH_SIZE
+from src.utils.cleandescription import cleandescription
+from src.utils.dateutils import to_utc, is_newer, parse_date
+from src.utils.normalizetags import normalize_tags
+from src.utils.metrics import observe
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class RawFields:
+    """Сырые поля элемента ленты, которые нормализует пул."""
+    date: str
+    description: str = ""
+    tags: Tuple[str, ...] = ()
+    # Как в cleandescription: None — полный текст (нужен для фильтра по ключевым словам)
+    max_chars: Optional[int] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Normalized:
+    published_at: datetime
+    description: str
+    tags: Tuple[str, ...]
+
+
+def normalize(fields: RawFields, newer_than: Optional[datetime]) -> Optional[Normalized]:
+    """
+    Разбирает дату и, только если вакансия новее newer_than, очищает описание
+    и нормализует теги. Выполняется в рабочем процессе или потоке, поэтому
+    принимает и возвращает только сериализуемые значения.
+    :return: None, если дату разобрать не удалось или вакансия не новая.
+    """
+    try:
+        parsed = parse_date(fields.date) if fields.date else None
+    except Exception as e:
+        logger.warning("Ошибка при обработке даты: %s, %s", fields.date, e)
+        return None
+    if not parsed:
+        if fields.date:
+            logger.warning("Не удалось разобрать дату: %s", fields.date)
+        return None
+    published_at = to_utc(parsed)
+    if not is_newer(published_at, newer_than):
+        return None
+    return Normalized(
+        published_at=published_at,
+        description=cleandescription(fields.description, max_chars=fields.max_chars),
+        tags=tuple(normalize_tags(list(fields.tags)))
+    )
+
+
+def normalize_batch(batch: List[RawFields], newer_than: Optional[datetime]) -> List[Optional[Normalized]]:
+    return [normalize(fields, newer_than) for fields in batch]
+
+
+def timed_batch(batch: List[RawFields], newer_than: Optional[datetime]) -> Tuple[List[Optional[Normalized]], float]:
+    """normalize_batch для пула: возвращает и время обработки пачки."""
+    started = time.perf_counter()
+    return normalize_batch(batch, newer_than), time.perf_counter() - started
+
+
+# Пулы по (вид, число исполнителей): создаются при первом обращении и живут до shutdown_executors
+_EXECUTORS: Dict[Tuple[str, int], Executor] = {}
+
+
+def get_executor(workers: int = NORMALIZE_WORKERS, kind: str = NORMALIZE_EXECUTOR) -> Optional[Executor]:
+    """
+    Пул для нормализации: "process" — ProcessPoolExecutor (разбор HTML и дат
+    упирается в GIL, поэтому по умолчанию процессы), "thread" — ThreadPoolExecutor.
+    :return: None при workers=0 — нормализация выполняется в цикле событий.
+    """
+    if workers <= 0:
+        return None
+    key = (kind, workers)
+    if key not in _EXECUTORS:
+        if kind == "thread":
+            _EXECUTORS[key] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="normalize")
+        else:
+            _EXECUTORS[key] = ProcessPoolExecutor(max_workers=workers)
+        logger.info("Запущен пул нормализации: %s, исполнителей: %s", kind, workers)
+    return _EXECUTORS[key]
+
+
+def shutdown_executors() -> None:
+    for executor in _EXECUTORS.values():
+        executor.shutdown(cancel_futures=True)
+    _EXECUTORS.clear()
+
+
+async def normalize_stream(
+    items: AsyncIterator[T],
+    extract: Callable[[T], Optional[RawFields]],
+    newer_than: Optional[datetime],
+    workers: int = NORMALIZE_WORKERS,
+    kind: str = NORMALIZE_EXECUTOR,
+    batch_size: int = NORMALIZE_BATCH_SIZE
+) -> AsyncIterator[Tuple[T, Normalized]]:
+    """
+    Нормализует элементы ленты пачками по batch_size в пуле исполнителей
+    и отдаёт пары (элемент, результат) в исходном порядке, пропуская
+    элементы без даты и не новее newer_than.
+    Пока пул обрабатывает до workers пачек, следующая читается из сети;
+    при workers=0 пачки обрабатываются прямо в цикле событий.
+    :param extract: Сырые поля элемента; None — элемент пропускается.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor(workers, kind)
+    pending: Deque[Tuple[List[T], asyncio.Future]] = deque()
+
+    def submit(batch: List[T], fields: List[RawFields]) -> None:
+        if executor is None:
+            future = loop.create_future()
+            future.set_result(normalize_batch(fields, newer_than))
+        else:
+            # Метрики очистки и дат в рабочих процессах не собираются: учитывается вся пачка
+            future = loop.run_in_executor(executor, timed_batch, fields, newer_than)
+        pending.append((batch, future))
+
+    async def results(future: asyncio.Future) -> List[Optional[Normalized]]:
+        if executor is None:
+            return future.result()
+        batch_results, seconds = await future
+        observe("normalize", seconds)
+        return batch_results
+
+    batch: List[T] = []
+    fields: List[RawFields] = []
+    try:
+        async for item in items:
+            raw = extract(item)
+            if raw is None:
+                continue
+            batch.append(item)
+            fields.append(raw)
+            if len(batch) < batch_size:
+                continue
+            submit(batch, fields)
+            batch, fields = [], []
+            while len(pending) > max(workers, 0):
+                done, future = pending.popleft()
+                for item_done, result in zip(done, await results(future)):
+                    if result is not None:
+                        yield item_done, result
+        if batch:
+            submit(batch, fields)
+        while pending:
+            done, future = pending.popleft()
+            for item_done, result in zip(done, await results(future)):
+                if result is not None:
+                    yield item_done, result
+    finally:
+        for _, future in pending:
+            future.cancel()
+        # Поток ленты закрывается сразу, а не сборщиком мусора, если чтение прервано
+        aclose = getattr(items, "aclose", None)
+        if aclose is not None:
+            await aclose()
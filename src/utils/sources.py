@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional
+from constants import SOURCES_FILE
+
+logger = logging.getLogger(__name__)
+
+ENV_RE = re.compile(r"\$\{(\w+)\}")
+
+
+@dataclass
+class SourceConfig:
+    """
+    Описание источника вакансий из конфигурации.
+    name — уникальное имя, оно же ключ состояния (дата последней публикации, просмотренные ID);
+    type — тип парсера в реестре; options — дополнительные аргументы конструктора парсера.
+    """
+    name: str
+    type: str
+    url: str = ""
+    keywords: str = ""
+    enabled: bool = True
+    concurrency: Optional[int] = None
+    schedule: Dict[str, Any] = field(default_factory=dict)
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+def expand_env(value: Any) -> Any:
+    """
+    Подставляет переменные окружения вида ${NAME} в строки конфигурации,
+    чтобы ключи и адреса API оставались в .env. Незаданная переменная даёт "".
+    """
+    if isinstance(value, str):
+        return ENV_RE.sub(lambda match: os.getenv(match.group(1), ""), value)
+    if isinstance(value, list):
+        return [expand_env(item) for item in value]
+    if isinstance(value, dict):
+        return {key: expand_env(item) for key, item in value.items()}
+    return value
+
+
+def parse_source(raw: Dict[str, Any]) -> SourceConfig:
+    """
+    Проверяет и разбирает описание одного источника.
+    :raises ValueError: Если нет name/type или есть неизвестные поля.
+    """
+    known = {item.name for item in fields(SourceConfig)}
+    unknown = set(raw) - known
+    if unknown:
+        raise ValueError(f"Неизвестные поля источника {raw.get('name')}: {', '.join(sorted(unknown))}")
+    if not raw.get("name") or not raw.get("type"):
+        raise ValueError(f"У источника должны быть name и type: {raw}")
+    source = SourceConfig(**expand_env(raw))
+    if isinstance(source.enabled, str):
+        source.enabled = source.enabled.strip().lower() in ("1", "true", "yes", "on")
+    if source.concurrency is not None:
+        source.concurrency = max(1, int(source.concurrency))
+    return source
+
+
+def load_sources(path: str = SOURCES_FILE) -> List[SourceConfig]:
+    """
+    Загружает список источников из JSON-файла конфигурации.
+    :return: Все источники, включая выключенные.
+    :raises ValueError: Если конфигурация некорректна или имена повторяются.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    sources = [parse_source(raw) for raw in data.get("sources", [])]
+    names = [source.name for source in sources]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Повторяющиеся имена источников: {', '.join(sorted(duplicates))}")
+
+    enabled = [source.name for source in sources if source.enabled]
+    logger.info("Загружено источников: %s, включено: %s (%s)", len(sources), len(enabled), ', '.join(enabled))
+    return sources
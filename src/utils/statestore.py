@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from constants import STATE_DB, SEEN_TTL_DAYS
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    source TEXT PRIMARY KEY,
+    last_published_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seen (
+    source TEXT NOT NULL,
+    vacancy_id TEXT NOT NULL,
+    seen_at TEXT NOT NULL,
+    PRIMARY KEY (source, vacancy_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class StateStore:
+    """
+    Состояние парсеров в SQLite (WAL): дата последней публикации
+    и ID уже опубликованных вакансий по каждому источнику.
+    ID опубликованной вакансии записывается сразу после отправки (маленькие
+    транзакции в WAL дёшевы): если процесс упадёт посреди запуска, уже
+    отправленное не будет опубликовано повторно. Даты последней публикации
+    копятся в памяти и записываются в commit() по завершении запуска.
+    """
+    def __init__(self, path: str = STATE_DB, seen_ttl_days: int = SEEN_TTL_DAYS):
+        self.path = path
+        self.seen_ttl = timedelta(days=seen_ttl_days)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._seen_count = 0
+        self._pending_watermarks: Dict[str, str] = {}
+
+    def import_legacy_files(self, files: Dict[str, str]) -> None:
+        """
+        Однократно переносит даты из старых last_published_*.json.
+        :param files: {источник: путь к JSON-файлу}.
+        """
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+            return
+        rows = []
+        for source, path in files.items():
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r") as file:
+                    date = datetime.fromisoformat(json.load(file)["last_published_date"])
+                rows.append((source, date.isoformat()))
+            except (json.JSONDecodeError, KeyError, ValueError, OSError) as e:
+                logger.error("Ошибка при импорте %s: %s", path, e)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO watermarks (source, last_published_date) VALUES (?, ?)", rows
+            )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_imported', ?)",
+                              (datetime.now(timezone.utc).isoformat(),))
+        logger.info("Импортировано дат из JSON-файлов: %s", len(rows))
+
+    def has_history(self, source: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM seen WHERE source = ? LIMIT 1", (source,)).fetchone() is not None
+
+    def load_watermark(self, source: str, lookback: timedelta = timedelta(0)) -> Optional[datetime]:
+        """
+        Возвращает дату последней публикации источника.
+        Если по источнику уже есть опубликованные ID, дата сдвигается назад
+        на lookback: вакансии с той же или слегка сдвинутой датой
+        не теряются, а повторы отсекаются по ID.
+        """
+        value = self._pending_watermarks.get(source)
+        if value is None:
+            row = self.conn.execute(
+                "SELECT last_published_date FROM watermarks WHERE source = ?", (source,)
+            ).fetchone()
+            value = row[0] if row else None
+        if value is None:
+            return None
+        date = datetime.fromisoformat(value)
+        if lookback and self.has_history(source):
+            date -= lookback
+        return date
+
+    def save_watermark(self, source: str, date: datetime) -> None:
+        self._pending_watermarks[source] = date.isoformat()
+
+    def is_seen(self, source: str, vacancy_id: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM seen WHERE source = ? AND vacancy_id = ?", (source, vacancy_id)
+        ).fetchone() is not None
+
+    def mark_seen(self, source: str, vacancy_id: str) -> None:
+        """
+        Отмечает вакансию опубликованной отдельной транзакцией — сразу после отправки.
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO seen (source, vacancy_id, seen_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (source, vacancy_id) DO UPDATE SET seen_at = excluded.seen_at",
+                (source, vacancy_id, datetime.now(timezone.utc).isoformat())
+            )
+        self._seen_count += 1
+
+    def commit(self) -> None:
+        """
+        Записывает даты последней публикации за запуск одной транзакцией
+        и удаляет ID старше seen_ttl.
+        """
+        border = (datetime.now(timezone.utc) - self.seen_ttl).isoformat()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO watermarks (source, last_published_date) VALUES (?, ?) "
+                "ON CONFLICT (source) DO UPDATE SET last_published_date = excluded.last_published_date",
+                self._pending_watermarks.items()
+            )
+            self.conn.execute("DELETE FROM seen WHERE seen_at < ?", (border,))
+        logger.info("Состояние сохранено: %s ID, %s дат", self._seen_count, len(self._pending_watermarks))
+        self._seen_count = 0
+        self._pending_watermarks.clear()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+_store: Optional[StateStore] = None
+
+
+def get_state_store() -> StateStore:
+    """
+    Общее хранилище состояния процесса, открывается при первом обращении.
+    """
+    global _store
+    if _store is None:
+        _store = StateStore()
+    return _store
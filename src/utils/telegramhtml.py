@@ -0,0 +1,72 @@
+import re
+from typing import List
+
+# Теги, сущности и текст сообщения в HTML-разметке Telegram
+TOKEN_RE = re.compile(r"(<[^>]*>)|(&#?\w+;)|([^<&]+)|([<&])")
+TAG_NAME_RE = re.compile(r"</?\s*([a-zA-Z0-9-]+)")
+
+
+def utf16_length(text: str) -> int:
+    """Длина строки в единицах UTF-16 — так Telegram считает лимит сообщения."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def visible_length(html: str) -> int:
+    """
+    Длина текста, который увидит пользователь: теги не считаются,
+    HTML-сущность (&amp; и т. п.) — один символ.
+    """
+    length = 0
+    for tag, entity, text, stray in TOKEN_RE.findall(html):
+        if tag:
+            continue
+        length += 1 if entity or stray else utf16_length(text)
+    return length
+
+
+def truncate_html(html: str, limit: int, ellipsis: str = "…") -> str:
+    """
+    Обрезает сообщение до limit видимых символов, не разрезая теги и сущности,
+    и закрывает оставшиеся открытыми теги.
+    """
+    if visible_length(html) <= limit:
+        return html
+
+    budget = limit - utf16_length(ellipsis)
+    parts: List[str] = []
+    open_tags: List[str] = []
+    for match in TOKEN_RE.finditer(html):
+        tag, entity, text, stray = match.groups()
+        if tag:
+            name = TAG_NAME_RE.match(tag)
+            if name:
+                if tag.startswith("</"):
+                    if open_tags and open_tags[-1] == name.group(1).lower():
+                        open_tags.pop()
+                elif not tag.endswith("/>"):
+                    open_tags.append(name.group(1).lower())
+            parts.append(tag)
+            continue
+
+        chunk = entity or stray or text
+        size = 1 if entity or stray else utf16_length(text)
+        if size <= budget:
+            parts.append(chunk)
+            budget -= size
+            continue
+
+        # Сущность целиком не помещается — отбрасываем; текст режем посимвольно
+        if text:
+            cut = []
+            for char in text:
+                width = 2 if ord(char) > 0xFFFF else 1
+                if width > budget:
+                    break
+                cut.append(char)
+                budget -= width
+            parts.append("".join(cut).rstrip())
+        break
+
+    parts.append(ellipsis)
+    parts.extend(f"</{name}>" for name in reversed(open_tags))
+    return "".join(parts)
@@ -0,0 +1,19 @@
+import pytest
+from benchmarks.bench_cleandescription import SAMPLES
+from constants import DESCRIPTION_PREVIEW
+from src.utils.cleandescription import cleandescription
+
+
+@pytest.mark.parametrize("name", SAMPLES)
+def test_stream_matches_bs4(name):
+    html = SAMPLES[name]
+    assert cleandescription(html, backend="stream") == cleandescription(html, backend="bs4")
+
+
+@pytest.mark.parametrize("name", SAMPLES)
+def test_preview_keeps_prefix_and_overflow(name):
+    html = SAMPLES[name]
+    expected = cleandescription(html, backend="bs4")
+    preview = cleandescription(html, max_chars=DESCRIPTION_PREVIEW, backend="stream")
+    assert preview[:DESCRIPTION_PREVIEW] == expected[:DESCRIPTION_PREVIEW]
+    assert (len(preview) > DESCRIPTION_PREVIEW) == (len(expected) > DESCRIPTION_PREVIEW)
@@ -0,0 +1,31 @@
+import asyncio
+import json
+import pytest
+from src.utils.jsonstream import iter_json_array
+
+
+def decode(data: bytes, size: int):
+    async def chunks():
+        for start in range(0, len(data), size):
+            yield data[start:start + size]
+
+    async def collect():
+        return [item async for item in iter_json_array(chunks())]
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("text", ["[12.5]", "[1e3]", "[-0.25E-2, 7, true]", '[{"a": [1, 2]}, "x", null]'])
+@pytest.mark.parametrize("size", [1, 2, 3, 64])
+def test_values_split_across_chunks(text, size):
+    assert decode(text.encode(), size) == json.loads(text)
+
+
+def test_utf8_split_across_chunks():
+    text = '["Фронтенд 🚀"]'
+    assert decode(text.encode(), 1) == ["Фронтенд 🚀"]
+
+
+def test_truncated_array_raises():
+    with pytest.raises(ValueError):
+        decode(b"[1, 2", 2)
@@ -0,0 +1,22 @@
+from src.utils.keywordmatcher import KeywordMatcher, get_matcher
+
+
+def test_emoji_outside_bmp_separates_words():
+    matcher = KeywordMatcher.from_string("react, -php")
+    assert matcher.matches(title="Senior React🚀")
+    assert matcher.matches(title="💻React developer")
+    assert not matcher.matches(title="React🚀PHP")
+
+
+def test_bmp_text_still_uses_word_boundaries():
+    matcher = KeywordMatcher.from_string("java")
+    assert matcher.matches(title="Java ✓ developer")
+    assert not matcher.matches(title="JavaScript developer")
+
+
+def test_min_score_weights_fields():
+    matcher = get_matcher("react", min_score=3)
+    assert matcher.matches(title="React developer")
+    assert not matcher.matches(title="Frontend developer", description="We use React")
+    assert matcher.matches(title="Frontend developer", tags=["react"], description="React, hooks")
+    assert get_matcher("react").matches(title="Frontend developer", description="We use React")